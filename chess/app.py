@@ -12,7 +12,10 @@ class App:
         self.chess_view = ChessViewApp(self.controller, self.event_bus)
 
     def run(self):
-        self.chess_view.run()
+        try:
+            self.chess_view.run()
+        finally:
+            self.controller.close()
 
     def exit(self):
         self.chess_view.exit()
@@ -0,0 +1,77 @@
+# Search benchmark
+#
+# Searches the perft test positions to a fixed depth with every selective search technique,
+# then with each of them switched off, and reports the nodes every technique saves.
+#
+#   python -m chess.bench --depth 4
+#   python -m chess.bench --position kiwipete --depth 5
+
+import argparse
+import sys
+from dataclasses import dataclass, replace, fields
+
+from chess.models.chess.fen import parse_fen
+from chess.models.chess.search import Search, SearchLimits, SearchOptions
+from chess.models.chess.transposition_table import TranspositionTable
+from chess.perft import PERFT_POSITIONS, PERFT_POSITIONS_MAP, PerftPosition
+
+BENCH_TT_MB = 16
+
+
+@dataclass
+class BenchResult:
+    name: str
+    nodes: int
+    seconds: float
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+
+def run_bench(name: str, positions: list[PerftPosition], depth: int, options: SearchOptions) -> BenchResult:
+    nodes, seconds = 0, 0.0
+    for position in positions:
+        search = Search(parse_fen(position.fen), TranspositionTable(BENCH_TT_MB), options)
+        result = search.run(SearchLimits(depth=depth))
+        nodes += result.nodes
+        seconds += result.seconds
+    return BenchResult(name, nodes, seconds)
+
+
+def format_result(result: BenchResult, reference: BenchResult | None = None) -> str:
+    line = f'{result.name:<24} nodes {result.nodes:>10}  {result.seconds:8.2f}s  {result.nodes_per_second:>8.0f} nps'
+    if reference is not None and result.nodes > 0:
+        saved = 1 - reference.nodes / result.nodes
+        line += f'  saves {saved:6.1%}'
+    return line
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.bench',
+        description='Node savings of the selective search techniques'
+    )
+    parser.add_argument('--depth', type=int, default=4)
+    parser.add_argument('--position', action='append', choices=list(PERFT_POSITIONS_MAP),
+                        help='built-in test position, all of them by default')
+    args = parser.parse_args(argv)
+
+    if args.depth < 1:
+        parser.error('depth must be positive')
+    positions = [PERFT_POSITIONS_MAP[name] for name in args.position] if args.position else PERFT_POSITIONS
+
+    techniques = [option.name for option in fields(SearchOptions)]
+    full = run_bench('all', positions, args.depth, SearchOptions())
+    print(format_result(full))
+    for technique in techniques:
+        # The nodes the technique saves are the ones the search needs without it
+        result = run_bench('no ' + technique, positions, args.depth, replace(SearchOptions(), **{technique: False}))
+        print(format_result(result, full))
+    plain = SearchOptions(**{technique: False for technique in techniques})
+    print(format_result(run_bench('none', positions, args.depth, plain), full))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,26 +3,75 @@ from dataclasses import dataclass
 
 from chess.lib.singleton import singleton
 
+DEFAULT_TRANSPOSITION_TABLE_MB = 16
+DEFAULT_THINK_TIME = 1.0
+
 
 @singleton
 @dataclass
 class Config:
     debug: bool = False
+    # Memory limit of the search transposition table
+    transposition_table_mb: int = DEFAULT_TRANSPOSITION_TABLE_MB
+    # Play against the computer, it thinks that many seconds per move
+    computer: bool = False
+    think_time: float = DEFAULT_THINK_TIME
+    # Selective search techniques
+    null_move_pruning: bool = True
+    late_move_reductions: bool = True
+    futility_pruning: bool = True
+    check_extensions: bool = True
+    # Processes searching in parallel, one means the search runs in the game process
+    search_workers: int = 1
+    # Weights of the neural network evaluation, .npz file, the tables evaluate positions without it
+    nnue_path: str | None = None
+    # Piece-square values saved by the tuner, .npz file, the written tables are used without it
+    tables_path: str | None = None
 
 
 def configure():
     parser = argparse.ArgumentParser(
         prog='Chess',
-        description='Tui chess game'
+        description='Tui chess game',
+        # The parse runs at import under other tools too, their short options must not match the app flags
+        allow_abbrev=False
     )
     parser.add_argument('--debug', action='store_const', const=True, default=False)
+    parser.add_argument('--tt-mb', type=int, default=DEFAULT_TRANSPOSITION_TABLE_MB,
+                        help='transposition table size in MB')
+    parser.add_argument('--computer', action='store_const', const=True, default=False,
+                        help='play white against the computer')
+    parser.add_argument('--think-time', type=float, default=DEFAULT_THINK_TIME,
+                        help='computer thinking time per move in seconds')
+    parser.add_argument('--no-null-move', action='store_const', const=True, default=False,
+                        help='disable null move pruning')
+    parser.add_argument('--no-lmr', action='store_const', const=True, default=False,
+                        help='disable late move reductions')
+    parser.add_argument('--no-futility', action='store_const', const=True, default=False,
+                        help='disable futility pruning')
+    parser.add_argument('--no-check-extensions', action='store_const', const=True, default=False,
+                        help='disable check extensions')
+    parser.add_argument('--workers', type=int, default=1, help='parallel search processes')
+    parser.add_argument('--nnue', default=None, help='neural network evaluation weights, .npz file')
+    parser.add_argument('--tables', default=None, help='tuned piece-square values, .npz file saved by chess.tune')
 
-    args = parser.parse_args()
+    # Unknown arguments belong to the tools importing the config, e.g. pytest or perft
+    args, _ = parser.parse_known_args()
 
     debug_mode = args.debug
 
     config = Config(
-        debug=debug_mode
+        debug=debug_mode,
+        transposition_table_mb=args.tt_mb,
+        computer=args.computer,
+        think_time=args.think_time,
+        null_move_pruning=not args.no_null_move,
+        late_move_reductions=not args.no_lmr,
+        futility_pruning=not args.no_futility,
+        check_extensions=not args.no_check_extensions,
+        search_workers=args.workers,
+        nnue_path=args.nnue,
+        tables_path=args.tables
     )
     return config
 
@@ -1,19 +1,34 @@
 from chess.models.chess.games import ClassicGame, DebugGame
 from .base import BaseController
 from .constants import DEBUG_MOD_MAP
-from .game_session_controller import GameSessionController
+from .game_session_controller import GameSessionController, ComputerGameSessionController
 from ..config.config import CONFIG
 from ..models.chess.chess_engine import ChessEngine
+from ..models.chess.figures import FigureColor
+from ..models.chess.nnue import NeuralNetwork, enable_neural_evaluation
+from ..models.chess.parallel_search import ParallelSearch
+from ..models.chess.search import SearchLimits
 
 
 class ChessController(BaseController):
 
     def __init__(self):
-        pass
+        # Worker processes are started once and reused by every computer game
+        self._parallel_search: ParallelSearch | None = None
+        self._network: NeuralNetwork | None = None
+        if CONFIG.nnue_path is not None:
+            self._network = NeuralNetwork.load(CONFIG.nnue_path)
+
+    def close(self):
+        if self._parallel_search is not None:
+            self._parallel_search.close()
+            self._parallel_search = None
 
     def create_game(self) -> GameSessionController:
         if CONFIG.debug:
             return self.create_debug_game()
+        if CONFIG.computer:
+            return self.create_computer_game()
         return self.create_local_game()
 
     def create_local_game(self) -> GameSessionController:
@@ -26,3 +41,18 @@ class ChessController(BaseController):
         game = DebugGame(DEBUG_MOD_MAP)
         game_engine = ChessEngine(game)
         return GameSessionController(game_engine)
+
+    def create_computer_game(self, computer_color: FigureColor = FigureColor.BLACK) -> GameSessionController:
+        game = ClassicGame()
+        game_engine = ChessEngine(game)
+        if self._network is not None:
+            enable_neural_evaluation(game.game_state, self._network)
+        search = None
+        if CONFIG.search_workers > 1:
+            if self._parallel_search is None:
+                self._parallel_search = ParallelSearch(game.game_state, network=self._network)
+            search = self._parallel_search
+            search.game_state = game.game_state
+        return ComputerGameSessionController(
+            game_engine, computer_color, SearchLimits(time=CONFIG.think_time), search
+        )
@@ -1,11 +1,13 @@
 from typing import Type
 
 from chess.lib.vec import vec
-from chess.models.chess.chess_engine import AbstractChessEngine
+from chess.models.chess.chess_engine import AbstractChessEngine, ChessEngine
 from chess.models.chess.chess_game import ChessGame
-from chess.models.chess.figures import Figure
+from chess.models.chess.figures import Figure, FigureColor
 from chess.models.chess.game_mode import GameMode
 from chess.models.chess.game_state import GameState
+from chess.models.chess.parallel_search import ParallelSearch
+from chess.models.chess.search import Search, SearchLimits, SearchResult
 
 
 class GameSessionController(ChessGame):
@@ -17,7 +19,7 @@ class GameSessionController(ChessGame):
         self._game_engine = game_engine
 
     def do_peace(self, pos_from, pos_to, transform_pawn_into: Type[Figure]):
-        self._game_engine.do_peace(pos_from, pos_to, transform_pawn_into)
+        return self._game_engine.do_peace(pos_from, pos_to, transform_pawn_into)
 
     def get_available_cells(self, position) -> list[vec]:
         return self._game_engine.get_available_cells(position)
@@ -39,3 +41,32 @@ class GameSessionController(ChessGame):
     @property
     def game_mode(self):
         return self._game_engine.game_mode
+
+
+class ComputerGameSessionController(GameSessionController):
+    _game_engine: ChessEngine
+    last_result: SearchResult | None
+
+    def __init__(self, game_engine: ChessEngine, computer_color: FigureColor, limits: SearchLimits,
+                 search: Search | ParallelSearch | None = None):
+        super().__init__(game_engine)
+        self.computer_color = computer_color
+        self.limits = limits
+        self.last_result = None
+        if search is None:
+            search = Search(game_engine.game_state)
+        self._search = search
+        self.play_computer_move()
+
+    def do_peace(self, pos_from, pos_to, transform_pawn_into: Type[Figure]):
+        if not super().do_peace(pos_from, pos_to, transform_pawn_into):
+            return False
+        self.play_computer_move()
+        return True
+
+    def play_computer_move(self):
+        if self.game_state.current_step_player != self.computer_color:
+            return
+        self.last_result = self._search.run(self.limits)
+        if self.last_result.move is not None:
+            self._game_engine.play_move(self.last_result.move)
@@ -8,10 +8,10 @@ def is_vec_num_type(a):
     return is_num_type(a) or type(a) == vec
 
 def is_vec_type(a):
-    return type(a) == vec
+    return isinstance(a, vec)
 
 def is_tuple_type(a):
-    return type(a) == tuple
+    return isinstance(a, tuple)
 
 class NotNumericTypeError(TypeError):
     def __init__(self, value = None):
@@ -30,8 +30,10 @@ class NotNumericVecTypeError(TypeError):
         return f"Type is not a numeric or vec type" + got
 
 class vec:
+    __slots__ = ('x', 'y')
+
     def __init__(self, x, y = None) -> None:
-        if type(x) == vec:
+        if is_vec_type(x):
             self.x = x.x
             self.y = x.y
             return 
@@ -0,0 +1,115 @@
+# Precomputed attack tables indexed by square
+#
+# Tables are built once at import, every lookup is a single list index.
+# Sliding figures use occupancy-indexed tables: for every square only the blockers
+# on its rays matter (relevant mask), and each subset of that mask maps to the
+# finished attack set. Python ints hash natively, so a per-square dict plays the
+# role of the magic multiplication without searching for magic numbers.
+
+from chess.models.chess.bitboard import SQUARES_COUNT, square_index, square_x, square_y
+from chess.models.chess.constants import MIN_BORDER, MAX_BORDER
+from chess.models.chess.figures import FigureColor
+from chess.utils.utils import get_direction_by_color
+
+KNIGHT_OFFSETS = [(-2, 1), (-1, 2), (1, 2), (2, 1), (2, -1), (1, -2), (-2, -1), (-1, -2)]
+KING_OFFSETS = [(i, j) for i in (-1, 0, 1) for j in (-1, 0, 1) if i != 0 or j != 0]
+
+ROOK_DIRECTIONS = [(0, -1), (1, 0), (0, 1), (-1, 0)]
+BISHOP_DIRECTIONS = [(1, -1), (1, 1), (-1, 1), (-1, -1)]
+
+
+def is_board_square(x: int, y: int) -> bool:
+    return MIN_BORDER <= x <= MAX_BORDER and MIN_BORDER <= y <= MAX_BORDER
+
+
+def _build_leaper_table(offsets):
+    table = []
+    for square in range(SQUARES_COUNT):
+        x, y = square_x(square), square_y(square)
+        bitboard = 0
+        for dx, dy in offsets:
+            to_x, to_y = x + dx, y + dy
+            if is_board_square(to_x, to_y):
+                bitboard |= 1 << square_index(to_x, to_y)
+        table.append(bitboard)
+    return table
+
+
+def _build_pawn_table(color: FigureColor):
+    direction = get_direction_by_color(color)
+    return _build_leaper_table([(-1, direction), (1, direction)])
+
+
+KNIGHT_ATTACKS = _build_leaper_table(KNIGHT_OFFSETS)
+KING_ATTACKS = _build_leaper_table(KING_OFFSETS)
+
+# Indexed by color value, then by square
+PAWN_ATTACKS = [_build_pawn_table(FigureColor(value)) for value in range(len(FigureColor))]
+
+
+def _build_between_table():
+    """Squares strictly between two squares on one line, empty for squares not sharing a line"""
+    table = [[0] * SQUARES_COUNT for _ in range(SQUARES_COUNT)]
+    for square in range(SQUARES_COUNT):
+        x, y = square_x(square), square_y(square)
+        for dx, dy in ROOK_DIRECTIONS + BISHOP_DIRECTIONS:
+            between = 0
+            to_x, to_y = x + dx, y + dy
+            while is_board_square(to_x, to_y):
+                to_square = square_index(to_x, to_y)
+                table[square][to_square] = between
+                between |= 1 << to_square
+                to_x, to_y = to_x + dx, to_y + dy
+    return table
+
+
+BETWEEN_SQUARES = _build_between_table()
+
+
+def _ray_attacks(square: int, occupancy: int, directions) -> int:
+    """Walk the rays square by square, only used to fill the tables"""
+    x, y = square_x(square), square_y(square)
+    bitboard = 0
+    for dx, dy in directions:
+        to_x, to_y = x + dx, y + dy
+        while is_board_square(to_x, to_y):
+            bit = 1 << square_index(to_x, to_y)
+            bitboard |= bit
+            if occupancy & bit:
+                break
+            to_x, to_y = to_x + dx, to_y + dy
+    return bitboard
+
+
+def _relevant_mask(square: int, directions) -> int:
+    """Ray squares whose occupancy changes the attack set, the last square of each ray never does"""
+    x, y = square_x(square), square_y(square)
+    bitboard = 0
+    for dx, dy in directions:
+        to_x, to_y = x + dx, y + dy
+        while is_board_square(to_x + dx, to_y + dy):
+            bitboard |= 1 << square_index(to_x, to_y)
+            to_x, to_y = to_x + dx, to_y + dy
+    return bitboard
+
+
+def _build_sliding_tables(directions):
+    masks = []
+    tables = []
+    for square in range(SQUARES_COUNT):
+        mask = _relevant_mask(square, directions)
+        table = {}
+        # Enumerate every subset of the mask (Carry-Rippler trick)
+        subset = 0
+        while True:
+            table[subset] = _ray_attacks(square, subset, directions)
+            subset = (subset - mask) & mask
+            if subset == 0:
+                break
+        masks.append(mask)
+        tables.append(table)
+    return masks, tables
+
+
+ROOK_MASKS, ROOK_TABLES = _build_sliding_tables(ROOK_DIRECTIONS)
+BISHOP_MASKS, BISHOP_TABLES = _build_sliding_tables(BISHOP_DIRECTIONS)
@@ -0,0 +1,96 @@
+# Batch evaluation
+#
+# Evaluates many positions at once, e.g. the leaves of a search iteration or a games archive.
+# Positions are encoded as 12 planes of 64 squares, one plane per piece index, and scored with
+# a single matrix product against the piece-square tables instead of position by position.
+# Pawn structure terms are counted with array operations over the pawn planes as 8x8 boards.
+
+from itertools import islice
+from typing import Iterable
+
+import numpy as np
+
+from chess.models.chess.bitboard import PAWN, PIECES_COUNT, SQUARES_COUNT, piece_index
+from chess.models.chess.constants import BOARD_SIDE_SIZE
+from chess.models.chess.figures import FigureColor
+from chess.models.chess.game_state import GameState
+from chess.models.chess.pawn_structure import DOUBLED_PAWN_PENALTY, ISOLATED_PAWN_PENALTY, PASSED_PAWN_BONUS
+from chess.models.chess.piece_square_tables import PIECE_SQUARE_VALUES
+
+# Positions encoded at once, bounds the memory of the planes of a long iterable
+BATCH_SIZE = 4096
+
+# Float for the BLAS product, the sums of the table values are exact in float32
+PIECE_SQUARE_MATRIX = np.array(PIECE_SQUARE_VALUES, dtype=np.float32).reshape(PIECES_COUNT * SQUARES_COUNT)
+
+
+def get_bitboards(game_states: list[GameState]) -> np.ndarray:
+    """Bitboards of the positions, shape (N, 12)"""
+    return np.array([game_state.board.bitboards for game_state in game_states], dtype=np.uint64) \
+        .reshape(len(game_states), PIECES_COUNT)
+
+
+def encode_bitboards(bitboards: np.ndarray) -> np.ndarray:
+    """Bitboards of shape (N, 12) as planes of shape (N, 12, 64), bit of the square is 1 when a figure is on it"""
+    octets = bitboards.astype('<u8').view(np.uint8).reshape(len(bitboards), PIECES_COUNT, 8)
+    return np.unpackbits(octets, axis=-1, bitorder='little')
+
+
+def encode_positions(game_states: list[GameState]) -> np.ndarray:
+    return encode_bitboards(get_bitboards(game_states))
+
+
+def get_sides(game_states: list[GameState]) -> np.ndarray:
+    """1 for the positions with white to move, -1 for black, shape (N,)"""
+    return np.array(
+        [1 if game_state.current_step_player == FigureColor.WHITE else -1 for game_state in game_states],
+        dtype=np.int32
+    )
+
+
+def evaluate_planes(planes: np.ndarray) -> np.ndarray:
+    """Material and placement score of white over black for every position of the planes"""
+    scores = planes.reshape(len(planes), PIECES_COUNT * SQUARES_COUNT) @ PIECE_SQUARE_MATRIX
+    return scores.astype(np.int32)
+
+
+def _evaluate_pawns(own: np.ndarray, enemy: np.ndarray, color: FigureColor) -> np.ndarray:
+    """Pawn structure scores of the side owning the pawns, boards of shape (N, 8, 8) by row, then file"""
+    files = own.sum(axis=1)
+    neighbours = np.zeros_like(files)
+    neighbours[:, 1:] += files[:, :-1]
+    neighbours[:, :-1] += files[:, 1:]
+    score = -DOUBLED_PAWN_PENALTY * np.maximum(files - 1, 0).sum(axis=1)
+    score -= ISOLATED_PAWN_PENALTY * (files * (neighbours == 0)).sum(axis=1)
+
+    # Enemy pawns covering every file with its adjacent ones
+    stoppers = enemy.copy()
+    stoppers[:, :, 1:] |= enemy[:, :, :-1]
+    stoppers[:, :, :-1] |= enemy[:, :, 1:]
+    # Rows ahead of white pawns are above them, of black pawns below
+    if color == FigureColor.BLACK:
+        own, stoppers = own[:, ::-1], stoppers[:, ::-1]
+    blocked = np.zeros_like(stoppers)
+    blocked[:, 1:] = np.maximum.accumulate(stoppers, axis=1)[:, :-1]
+    # Rank of the row counted from the own side, the rows are flipped for black already
+    bonus = np.array(PASSED_PAWN_BONUS[::-1], dtype=np.int32)
+    score += ((own & (1 - blocked)) * bonus[:, None]).sum(axis=(1, 2))
+    return score
+
+
+def evaluate_pawn_planes(planes: np.ndarray) -> np.ndarray:
+    """Pawn structure score of white over black for every position of the planes"""
+    shape = (len(planes), BOARD_SIDE_SIZE, BOARD_SIDE_SIZE)
+    white = planes[:, piece_index(PAWN, FigureColor.WHITE)].reshape(shape).astype(np.int32)
+    black = planes[:, piece_index(PAWN, FigureColor.BLACK)].reshape(shape).astype(np.int32)
+    return _evaluate_pawns(white, black, FigureColor.WHITE) - _evaluate_pawns(black, white, FigureColor.BLACK)
+
+
+def evaluate_batch(game_states: Iterable[GameState]) -> np.ndarray:
+    """Scores of the positions from the point of view of the side to move, like evaluate"""
+    iterator = iter(game_states)
+    scores = []
+    while batch := list(islice(iterator, BATCH_SIZE)):
+        planes = encode_positions(batch)
+        scores.append((evaluate_planes(planes) + evaluate_pawn_planes(planes)) * get_sides(batch))
+    return np.concatenate(scores) if scores else np.zeros(0, dtype=np.int32)
@@ -0,0 +1,129 @@
+# Bitboard primitives: square indexing, piece indexing and bit helpers
+#
+# Squares are numbered row by row from the top left corner of the board,
+# so square = y * 8 + x and the bit of a square is 1 << square.
+
+from chess.lib.vec import vec
+from chess.models.chess.constants import BOARD_SIDE_SIZE
+from .figures import Figure, FigureColor, Pawn, Knight, Bishop, Rook, Quin, King
+
+SQUARES_COUNT = BOARD_SIDE_SIZE * BOARD_SIDE_SIZE
+EMPTY_BITBOARD = 0
+FULL_BITBOARD = (1 << SQUARES_COUNT) - 1
+# XORed with a square, mirrors it between the top and the bottom rows
+MIRROR_SQUARE = SQUARES_COUNT - BOARD_SIDE_SIZE
+
+PAWN = 0
+KNIGHT = 1
+BISHOP = 2
+ROOK = 3
+QUIN = 4
+KING = 5
+
+KINDS_COUNT = 6
+PIECES_COUNT = KINDS_COUNT * len(FigureColor)
+
+FIGURE_KINDS = {
+    Pawn: PAWN,
+    Knight: KNIGHT,
+    Bishop: BISHOP,
+    Rook: ROOK,
+    Quin: QUIN,
+    King: KING,
+}
+
+KIND_FIGURES = (Pawn, Knight, Bishop, Rook, Quin, King)
+
+# Shared figure of every piece index and the piece index of every figure
+PIECE_FIGURES = tuple(KIND_FIGURES[kind](color) for color in FigureColor for kind in range(KINDS_COUNT))
+FIGURE_PIECES = {figure: piece for piece, figure in enumerate(PIECE_FIGURES)}
+
+FILES = 'abcdefgh'
+
+
+def square_index(x: int, y: int) -> int:
+    return y * BOARD_SIDE_SIZE + x
+
+
+def square_x(square: int) -> int:
+    return square % BOARD_SIDE_SIZE
+
+
+def square_y(square: int) -> int:
+    return square // BOARD_SIDE_SIZE
+
+
+class SquarePosition(vec):
+    """Immutable position of a board square, the 64 shared instances are in SQUARE_POSITIONS"""
+    __slots__ = ('square',)
+
+    def __init__(self, square: int) -> None:
+        object.__setattr__(self, 'x', square % BOARD_SIDE_SIZE)
+        object.__setattr__(self, 'y', square // BOARD_SIDE_SIZE)
+        object.__setattr__(self, 'square', square)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('Square position is immutable')
+
+    def __hash__(self) -> int:
+        return hash((self.x, self.y))
+
+    def __reduce__(self):
+        return square_position, (self.square,)
+
+    # In-place operators make a new vec as for tuples
+    __iadd__ = vec.__add__
+    __isub__ = vec.__sub__
+    __imul__ = vec.__mul__
+    __ifloordiv__ = vec.__floordiv__
+
+    def copy(self) -> vec:
+        return vec(self.x, self.y)
+
+
+SQUARE_POSITIONS = tuple(SquarePosition(square) for square in range(SQUARES_COUNT))
+
+
+def square_position(square: int) -> SquarePosition:
+    return SQUARE_POSITIONS[square]
+
+
+def position_square(pos) -> int:
+    return pos[1] * BOARD_SIDE_SIZE + pos[0]
+
+
+def square_name(square: int) -> str:
+    """Algebraic name of the square, the top row is the eighth rank"""
+    return FILES[square % BOARD_SIDE_SIZE] + str(BOARD_SIDE_SIZE - square // BOARD_SIDE_SIZE)
+
+
+def name_square(name: str) -> int:
+    return square_index(FILES.index(name[0]), BOARD_SIDE_SIZE - int(name[1]))
+
+
+def piece_index(kind: int, color: FigureColor) -> int:
+    return color.value * KINDS_COUNT + kind
+
+
+def figure_piece_index(figure: Figure) -> int:
+    return FIGURE_PIECES[figure]
+
+
+def lsb_square(bitboard: int) -> int:
+    return (bitboard & -bitboard).bit_length() - 1
+
+
+def popcount(bitboard: int) -> int:
+    return bitboard.bit_count()
+
+
+def iter_squares(bitboard: int):
+    """Yield squares of the set bits from the lowest to the highest"""
+    while bitboard:
+        lsb = bitboard & -bitboard
+        yield lsb.bit_length() - 1
+        bitboard ^= lsb
+
+
+def bitboard_positions(bitboard: int) -> list[SquarePosition]:
+    return [square_position(square) for square in iter_squares(bitboard)]
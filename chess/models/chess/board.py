@@ -1,41 +1,76 @@
 # Chess board model
 
 from chess.models.chess.constants import *
+from .bitboard import EMPTY_BITBOARD, PIECES_COUNT, KINDS_COUNT, PAWN, KING, FIGURE_KINDS, \
+    figure_piece_index, piece_index, square_index, position_square, square_position, lsb_square
+from .mailbox import EMPTY, CELL_FIGURES, Mailbox
 from .figures import Figure, FigureColor, Pawn, Rook, Knight, Bishop, King, Quin
+from .zobrist import PIECE_KEYS
 from ...lib.vec import vec
 from ...utils import str_to_list
 from ...views.utils import symbol_figure_color_map
 
 
 class Cell:
-    content: Figure | None
+    """View of one square of a board"""
 
-    def __init__(self, content: Figure | None = None) -> None:
-        self._content = content
+    def __init__(self, board: 'Board', square: int) -> None:
+        self._board = board
+        self._square = square
 
     def clear(self):
-        self._content = None
+        self.content = None
 
     @property
-    def content(self):
-        return self._content
+    def board(self) -> 'Board':
+        return self._board
+
+    @property
+    def square(self) -> int:
+        return self._square
+
+    @property
+    def position(self) -> vec:
+        return square_position(self._square)
+
+    @property
+    def content(self) -> Figure | None:
+        return self._board.get_figure(self._square)
 
     @content.setter
     def content(self, figure: Figure | None):
-        self._content = figure
+        self._board.set_figure(self._square, figure)
 
 
 class Board:
-    def __init__(self, matrix: list | None = None) -> None:
-        if matrix is not None:
-            self.board = matrix
-        else:
-            # Generate matrix 8x8
-            self.board = self.create_init_state()
+    """View of a mailbox with the bitboards and Zobrist keys of its pieces"""
+    mailbox: Mailbox
+    bitboards: list[int]
+    color_bitboards: list[int]
+    occupancy: int
+    # Zobrist key of the figures placement
+    key: int
+    # Zobrist key of the pawns alone, the pawn structure cache is keyed by it
+    pawn_key: int
+
+    def __init__(self, mailbox: Mailbox | None = None) -> None:
+        self.mailbox = mailbox if mailbox is not None else Mailbox()
+        self._bind_mailbox()
+        self._rows: list[list[Cell]] | None = None
 
         self.white_figures = []
         self.black_figures = []
 
+    @property
+    def board(self) -> list[list[Cell]]:
+        """Rows of the cell views, the top row first"""
+        # Views only keep the board and the square, so they stay valid while the figures change
+        if self._rows is None:
+            self._rows = [
+                [Cell(self, square_index(x, y)) for x in range(BOARD_SIDE_SIZE)] for y in range(BOARD_SIDE_SIZE)
+            ]
+        return self._rows
+
     @staticmethod
     def build():
         board = Board()
@@ -102,37 +137,99 @@ class Board:
 
         return board
 
+    def copy(self) -> 'Board':
+        board = Board.__new__(Board)
+        board.mailbox = self.mailbox.copy()
+        board._rows = None
+        board.bitboards = self.bitboards.copy()
+        board.color_bitboards = self.color_bitboards.copy()
+        board.occupancy, board.key, board.pawn_key = self.occupancy, self.key, self.pawn_key
+        board.white_figures, board.black_figures = self.white_figures, self.black_figures
+        return board
 
+    def __getstate__(self):
+        # The cell views are rebuilt on demand, they would only grow the positions sent to the workers
+        state = self.__dict__.copy()
+        del state['_rows']
+        return state
 
-    @staticmethod
-    def create_init_state():
-        return [[Cell() for _ in range(BOARD_SIDE_SIZE)] for _ in range(BOARD_SIDE_SIZE)]
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._rows = None
 
     def get_figures(self):
         return self.white_figures, self.black_figures
 
     def get_cell(self, pos: BoardPos) -> Cell | None:
-        if len(self.board) <= pos[0] or len(self.board[pos[0]]) <= pos[1]:
+        if not (0 <= pos[0] < BOARD_SIDE_SIZE and 0 <= pos[1] < BOARD_SIDE_SIZE):
             return None
-        return self.board[pos[1]][pos[0]]
+        return Cell(self, position_square(pos))
+
+    def get_figures_bitboard(self, figure_cls: type, color: FigureColor) -> int:
+        return self.bitboards[piece_index(FIGURE_KINDS[figure_cls], color)]
 
-    def get_cell_position(self, cell):
-        for row_idx, row in enumerate(self.board):
-            for c_idx, c in enumerate(row):
-                if c == cell:
-                    return vec(c_idx, row_idx)
-        return None
+    def get_color_bitboard(self, color: FigureColor) -> int:
+        return self.color_bitboards[color.value]
+
+    def get_king_square(self, color: FigureColor) -> int | None:
+        king_bitboard = self.bitboards[piece_index(KING, color)]
+        if king_bitboard == EMPTY_BITBOARD:
+            return None
+        return lsb_square(king_bitboard)
+
+    def update_bitboards(self, square: int, old: int | None, new: int | None):
+        """Follow the change of the piece index on the square"""
+        bit = 1 << square
+        if old is not None:
+            self.bitboards[old] &= ~bit
+            self.color_bitboards[old // KINDS_COUNT] &= ~bit
+            self.occupancy &= ~bit
+            self.key ^= PIECE_KEYS[old][square]
+            if old % KINDS_COUNT == PAWN:
+                self.pawn_key ^= PIECE_KEYS[old][square]
+        if new is not None:
+            self.bitboards[new] |= bit
+            self.color_bitboards[new // KINDS_COUNT] |= bit
+            self.occupancy |= bit
+            self.key ^= PIECE_KEYS[new][square]
+            if new % KINDS_COUNT == PAWN:
+                self.pawn_key ^= PIECE_KEYS[new][square]
+
+    def _bind_mailbox(self):
+        """Bitboards and keys of the mailbox pieces"""
+        self.bitboards = [EMPTY_BITBOARD] * PIECES_COUNT
+        self.color_bitboards = [EMPTY_BITBOARD] * len(FigureColor)
+        self.occupancy = EMPTY_BITBOARD
+        self.key = 0
+        self.pawn_key = 0
+        for square, piece in self.mailbox.iter_pieces():
+            self.update_bitboards(square, None, piece)
+
+    def get_figure(self, square: int) -> Figure | None:
+        return CELL_FIGURES[self.mailbox.cells[square]]
+
+    def set_figure(self, square: int, figure: Figure | None):
+        cells = self.mailbox.cells
+        old = cells[square]
+        piece = figure_piece_index(figure) if figure is not None else None
+        self.update_bitboards(square, old - 1 if old != EMPTY else None, piece)
+        cells[square] = piece + 1 if piece is not None else EMPTY
+
+    def get_cell_position(self, cell: Cell) -> vec | None:
+        if cell.board is not self:
+            return None
+        return cell.position
 
     def move_figure(self, pos_from: BoardPos, pos_to: BoardPos):
-        cell_from = self.get_cell(pos_from)
-        cell_to = self.get_cell(pos_to)
+        self.move_figure_by_square(position_square(pos_from), position_square(pos_to))
 
-        figure_from = cell_from.content
-        cell_to.content = figure_from
-        cell_from.clear()
+    def move_figure_by_square(self, square_from: int, square_to: int):
+        self.set_figure(square_to, self.get_figure(square_from))
+        self.set_figure(square_from, None)
 
     def reset(self):
-        self.board = self.create_init_state()
+        self.mailbox = Mailbox()
+        self._bind_mailbox()
 
     def set_cell_content(self, pos_x, pos_y, content: Figure | None):
-        self.board[pos_y][pos_x].content = content
+        self.set_figure(square_index(pos_x, pos_y), content)
@@ -0,0 +1,27 @@
+# Static position evaluation
+#
+# Scores are in centipawns from the point of view of the side to move. The material and placement
+# score is kept by the game state move by move, so evaluating a position doesn't scan the board.
+# Pawn structure terms are added to it. A game state with a neural network accumulator is evaluated
+# by the network instead.
+
+from chess.models.chess.bitboard import PAWN
+from chess.models.chess.figures import FigureColor
+from chess.models.chess.game_state import GameState
+from chess.models.chess.pawn_structure import PawnHashTable, evaluate_pawn_structure
+from chess.models.chess.piece_square_tables import FIGURE_VALUES
+
+
+def evaluate(game_state: GameState, pawn_table: PawnHashTable | None = None) -> int:
+    """Score of the position, the pawn table caches the pawn structure scores between the calls"""
+    if game_state.accumulator is not None:
+        return game_state.accumulator.evaluate(game_state.current_step_player)
+    board = game_state.board
+    pawns_score = pawn_table.get_score(board) if pawn_table is not None else evaluate_pawn_structure(board)
+    score = game_state.score + pawns_score
+    return score if game_state.current_step_player == FigureColor.WHITE else -score
+
+
+def pawn_advantage(game_state: GameState) -> float:
+    """Advantage of white in pawns, negative when black is better"""
+    return (game_state.score + evaluate_pawn_structure(game_state.board)) / FIGURE_VALUES[PAWN]
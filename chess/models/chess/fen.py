@@ -0,0 +1,140 @@
+# Forsyth-Edwards Notation support
+#
+# The first rank of the FEN string is the top row of the board (y = 0), the "a" file is x = 0.
+
+from chess.models.chess.bitboard import FIGURE_KINDS, PIECES_COUNT, EMPTY_BITBOARD, name_square, square_name, \
+    square_index, piece_index
+from chess.models.chess.board import Board
+from chess.models.chess.constants import BOARD_SIDE_SIZE, LEFT_BORDER, RIGHT_BORDER
+from chess.models.chess.figures import FigureColor, Pawn, Knight, Bishop, Rook, Quin, King
+from chess.models.chess.mailbox import Mailbox
+from chess.models.chess.game_state import GameState, castling_right, get_placement_castling_rights
+
+START_FEN = 'rnbqkbnr/pppppppp/8/8/8/8/PPPPPPPP/RNBQKBNR w KQkq - 0 1'
+
+FEN_FIGURES = {
+    'p': Pawn,
+    'n': Knight,
+    'b': Bishop,
+    'r': Rook,
+    'q': Quin,
+    'k': King,
+}
+
+CASTLING_SYMBOLS = {
+    'K': (FigureColor.WHITE, RIGHT_BORDER),
+    'Q': (FigureColor.WHITE, LEFT_BORDER),
+    'k': (FigureColor.BLACK, RIGHT_BORDER),
+    'q': (FigureColor.BLACK, LEFT_BORDER),
+}
+
+
+# Castling right bits of GameState.castling_rights in the FEN order
+CASTLING_RIGHTS_SYMBOLS = tuple((symbol, castling_right(*CASTLING_SYMBOLS[symbol])) for symbol in 'KQkq')
+
+FIGURE_SYMBOLS = {FIGURE_KINDS[figure_cls]: symbol for symbol, figure_cls in FEN_FIGURES.items()}
+
+# Piece index by the FEN symbol
+FEN_PIECES = {
+    symbol.upper() if color == FigureColor.WHITE else symbol: piece_index(FIGURE_KINDS[figure_cls], color)
+    for symbol, figure_cls in FEN_FIGURES.items()
+    for color in FigureColor
+}
+
+
+class FenError(ValueError):
+    pass
+
+
+def _parse_placement(placement: str) -> Board:
+    mailbox = Mailbox()
+    for square, piece in enumerate(_iter_placement(placement)):
+        if piece is not None:
+            mailbox.set_piece(square, piece)
+    return Board(mailbox)
+
+
+def _iter_placement(placement: str):
+    """Yield piece index or None of every square"""
+    rows = placement.split('/')
+    if len(rows) != BOARD_SIDE_SIZE:
+        raise FenError('FEN placement must have 8 rows. Got ' + str(len(rows)))
+
+    for row in rows:
+        x = 0
+        for symbol in row:
+            if symbol.isdigit():
+                empty = int(symbol)
+                if x + empty > BOARD_SIDE_SIZE:
+                    raise FenError(f'Wrong FEN row "{row}"')
+                yield from (None,) * empty
+                x += empty
+                continue
+            piece = FEN_PIECES.get(symbol)
+            if piece is None or x >= BOARD_SIDE_SIZE:
+                raise FenError(f'Wrong FEN row "{row}"')
+            yield piece
+            x += 1
+        if x != BOARD_SIDE_SIZE:
+            raise FenError(f'Wrong FEN row "{row}"')
+
+
+def parse_placement_bitboards(placement: str) -> list[int]:
+    """Bitboards of the figures placement by piece index, without building a board, for bulk data"""
+    bitboards = [EMPTY_BITBOARD] * PIECES_COUNT
+    for square, piece in enumerate(_iter_placement(placement)):
+        if piece is not None:
+            bitboards[piece] |= 1 << square
+    return bitboards
+
+
+def parse_fen(fen: str) -> GameState:
+    fields = fen.split()
+    if len(fields) < 4:
+        raise FenError('FEN must have at least 4 fields. Got ' + str(len(fields)))
+    placement, side, castling, en_passant = fields[:4]
+
+    board = _parse_placement(placement)
+    if side not in ('w', 'b'):
+        raise FenError(f'Wrong side to move "{side}"')
+    current_step_player = FigureColor.WHITE if side == 'w' else FigureColor.BLACK
+    en_passant_square = None if en_passant == '-' else name_square(en_passant)
+
+    castling_rights = 0
+    for symbol in castling.replace('-', ''):
+        if symbol not in CASTLING_SYMBOLS:
+            raise FenError(f'Wrong castling symbol "{symbol}"')
+        castling_rights |= castling_right(*CASTLING_SYMBOLS[symbol])
+
+    # Rights without the king and the rook on their initial squares are dropped
+    return GameState(
+        board=board,
+        current_step_player=current_step_player,
+        castling_rights=castling_rights & get_placement_castling_rights(board),
+        en_passant_square=en_passant_square
+    )
+
+
+def to_fen(game_state: GameState) -> str:
+    """FEN of the position, the move counters are not tracked and always start a game"""
+    board = game_state.board
+    rows = []
+    for y in range(BOARD_SIDE_SIZE):
+        row, empty = '', 0
+        for x in range(BOARD_SIDE_SIZE):
+            figure = board.get_figure(square_index(x, y))
+            if figure is None:
+                empty += 1
+                continue
+            if empty:
+                row += str(empty)
+                empty = 0
+            symbol = FIGURE_SYMBOLS[FIGURE_KINDS[type(figure)]]
+            row += symbol.upper() if figure.color == FigureColor.WHITE else symbol
+        rows.append(row + (str(empty) if empty else ''))
+
+    side = 'w' if game_state.current_step_player == FigureColor.WHITE else 'b'
+    rights = game_state.castling_rights
+    castling = ''.join(symbol for symbol, right in CASTLING_RIGHTS_SYMBOLS if rights & right) or '-'
+    en_passant = '-' if game_state.en_passant_square is None else square_name(game_state.en_passant_square)
+    return f'{"/".join(rows)} {side} {castling} {en_passant} 0 1'
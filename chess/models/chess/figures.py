@@ -6,38 +6,52 @@ class FigureColor(Enum):
     WHITE = 1
 
 
+# Shared figure instances by the figure class and color
+_FIGURES: dict[tuple[type, FigureColor], 'Figure'] = {}
+
+
 class Figure:
+    """Immutable kind and color of a piece, every kind and color has one shared instance"""
+    __slots__ = ('color',)
     color: FigureColor
 
-    def __init__(self, color: FigureColor) -> None:
-        self.color = color
+    def __new__(cls, color: FigureColor) -> 'Figure':
+        figure = _FIGURES.get((cls, color))
+        if figure is None:
+            figure = super().__new__(cls)
+            object.__setattr__(figure, 'color', color)
+            _FIGURES[cls, color] = figure
+        return figure
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f'{type(self).__name__} is immutable')
+
+    def __reduce__(self):
+        return type(self), (self.color,)
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.color})'
 
 
 class Pawn(Figure):
-    def __init__(self, color):
-        super(Pawn, self).__init__(color)
+    __slots__ = ()
 
 
 class Rook(Figure):
-    def __init__(self, color):
-        super(Rook, self).__init__(color)
+    __slots__ = ()
 
 
 class King(Figure):
-    def __init__(self, color):
-        super(King, self).__init__(color)
+    __slots__ = ()
 
 
 class Knight(Figure):
-    def __init__(self, color):
-        super(Knight, self).__init__(color)
+    __slots__ = ()
 
 
 class Quin(Figure):
-    def __init__(self, color):
-        super(Quin, self).__init__(color)
+    __slots__ = ()
 
 
 class Bishop(Figure):
-    def __init__(self, color):
-        super(Bishop, self).__init__(color)
+    __slots__ = ()
@@ -1,7 +1,55 @@
 # Object represents chess game state
 
+from chess.utils.utils import invert_color
+from .attacks import PAWN_ATTACKS
+from .bitboard import PIECE_FIGURES, PAWN, ROOK, SQUARES_COUNT, figure_piece_index, piece_index, square_index, \
+    square_x, square_y
 from .board import Board
-from .figures import FigureColor
+from .constants import BOARD_SIDE_SIZE, LEFT_BORDER, RIGHT_BORDER
+from .figures import FigureColor, Pawn, Rook, King
+from .move import Move, MOVE_SQUARE_BITS, MOVE_SQUARE_MASK, MOVE_FLAG_SHIFT, MOVE_FLAG_MASK, PROMOTION, EN_PASSANT, \
+    CASTLING, get_castling_rook_squares
+from .piece_square_tables import PIECE_SQUARE_VALUES, get_placement_score
+from .utils import get_side_by_color
+from .zobrist import SIDE_KEY, CASTLING_KEYS, CASTLING_RIGHTS_COUNT, en_passant_key
+
+ALL_CASTLING_RIGHTS = CASTLING_RIGHTS_COUNT - 1
+
+
+def castling_right(color: FigureColor, rook_x: int) -> int:
+    """Bit of the right to castle with the rook on the border, color value * 2 + 1 for the right one"""
+    return 1 << (color.value * 2 + (rook_x == RIGHT_BORDER))
+
+
+def _get_square_castling_masks() -> list[int]:
+    masks = [ALL_CASTLING_RIGHTS] * SQUARES_COUNT
+    for color in FigureColor:
+        for x in (LEFT_BORDER, RIGHT_BORDER):
+            masks[square_index(x, get_side_by_color(color))] &= ~castling_right(color, x)
+    return masks
+
+
+# Castling rights kept by a move from or to the square, a rook leaving its corner or captured there loses its right
+SQUARE_CASTLING_MASKS = _get_square_castling_masks()
+# Both castling rights of the color, lost by a move of its king, indexed by color value
+COLOR_CASTLING_RIGHTS = [
+    castling_right(color, LEFT_BORDER) | castling_right(color, RIGHT_BORDER) for color in FigureColor
+]
+
+
+def get_placement_castling_rights(board: Board) -> int:
+    """Castling rights of a king on its initial row and rooks in the corners of it, as if none has moved"""
+    rights = 0
+    for color in FigureColor:
+        king_square = board.get_king_square(color)
+        row = get_side_by_color(color)
+        if king_square is None or square_y(king_square) != row:
+            continue
+        for x in (LEFT_BORDER, RIGHT_BORDER):
+            rook = board.get_figure(square_index(x, row))
+            if type(rook) == Rook and rook.color == color:
+                rights |= castling_right(color, x)
+    return rights
 
 
 class GameState:
@@ -11,23 +59,193 @@ class GameState:
             winner: FigureColor | None = None,
             current_step_player: FigureColor = FigureColor.WHITE,
             board: Board = Board(),
-            was_figure_moved: dict = None
+            castling_rights: int | None = None,
+            en_passant_square: int | None = None
     ) -> None:
         self.is_game_end = is_game_end
         self._winner = None
         self.winner = winner
-        self.current_step_player = current_step_player
+        self._current_step_player = current_step_player
         self.board = board
-        self.was_figure_moved = was_figure_moved
+        # Square a pawn has just crossed with its double step
+        self._en_passant_square = en_passant_square
+        # Undo records of the played moves: (move, moved figure, captured figure, previous en passant square,
+        # previous castling rights, previous state key, previous score)
+        self.undo_stack: list[tuple] = []
+
+        # Bitmask of castling_right bits, a new game has all the rights its placement allows
+        if castling_rights is None:
+            castling_rights = get_placement_castling_rights(self.board)
+        self.castling_rights = castling_rights
+        # Zobrist key of the side to move, castling rights and en passant file, the board keeps the figures part
+        self._state_key = 0
+        self.refresh_position_key()
+        # Material and placement score of white over black in centipawns, updated by every move
+        self.score = get_placement_score(self.board.bitboards)
+        # Neural network accumulator updated by every move, set when the network evaluates the position
+        self.accumulator = None
+
+    def copy(self) -> 'GameState':
+        return GameState(
+            is_game_end=self.is_game_end,
+            winner=self.winner,
+            current_step_player=self._current_step_player,
+            board=self.board.copy(),
+            castling_rights=self.castling_rights,
+            en_passant_square=self.en_passant_square
+        )
+
+    @property
+    def current_step_player(self) -> FigureColor:
+        return self._current_step_player
+
+    @current_step_player.setter
+    def current_step_player(self, color: FigureColor):
+        if color != self._current_step_player:
+            square = self._en_passant_square
+            self._state_key ^= SIDE_KEY ^ self._en_passant_key(square, self._current_step_player) \
+                ^ self._en_passant_key(square, color)
+        self._current_step_player = color
+
+    @property
+    def en_passant_square(self) -> int | None:
+        return self._en_passant_square
+
+    @en_passant_square.setter
+    def en_passant_square(self, square: int | None):
+        color = self._current_step_player
+        self._state_key ^= self._en_passant_key(self._en_passant_square, color) ^ self._en_passant_key(square, color)
+        self._en_passant_square = square
+
+    def _en_passant_key(self, square: int | None, color: FigureColor) -> int:
+        """Key of the en passant file when a pawn of the color can take on the square, otherwise the position
+        is the same as without the square and must have the same key"""
+        if square is None or not PAWN_ATTACKS[1 - color.value][square] & self.board.bitboards[piece_index(PAWN, color)]:
+            return 0
+        return en_passant_key(square)
+
+    def position_key(self) -> int:
+        """64-bit Zobrist key of the position"""
+        return self.board.key ^ self._state_key
+
+    def refresh_position_key(self):
+        """Recompute the key from scratch, needed after the castling rights are changed directly"""
+        self._state_key = CASTLING_KEYS[self.castling_rights] \
+            ^ self._en_passant_key(self._en_passant_square, self._current_step_player)
+        if self._current_step_player == FigureColor.BLACK:
+            self._state_key ^= SIDE_KEY
+
+    def make_move(self, move: Move):
+        """Play a legal move of the side to move, unmake_move takes it back"""
+        board = self.board
+        square_from, square_to, flag = move & MOVE_SQUARE_MASK, move >> MOVE_SQUARE_BITS & MOVE_SQUARE_MASK, \
+            move >> MOVE_FLAG_SHIFT & MOVE_FLAG_MASK
+        figure = board.get_figure(square_from)
+        captured_square = square_to
+        if flag == EN_PASSANT:
+            captured_square = square_index(square_x(square_to), square_y(square_from))
+        captured = board.get_figure(captured_square)
+        # Taken before the figures move, the pawns that could take en passant may go
+        color = self._current_step_player
+        state_key = self._state_key ^ SIDE_KEY ^ self._en_passant_key(self._en_passant_square, color)
+        self.undo_stack.append((
+            move, figure, captured, self._en_passant_square, self.castling_rights, self._state_key, self.score
+        ))
+
+        if flag == EN_PASSANT:
+            board.set_figure(captured_square, None)
+        board.move_figure_by_square(square_from, square_to)
+        if flag == CASTLING:
+            rook_square, rook_to_square = get_castling_rook_squares(square_from, square_to)
+            board.move_figure_by_square(rook_square, rook_to_square)
+        elif flag == PROMOTION:
+            board.set_figure(square_to, PIECE_FIGURES[piece_index(move.promotion, figure.color)])
+
+        values = PIECE_SQUARE_VALUES
+        index = figure_piece_index(figure)
+        score = self.score - values[index][square_from]
+        if captured is not None:
+            score -= values[figure_piece_index(captured)][captured_square]
+        if flag == PROMOTION:
+            score += values[piece_index(move.promotion, figure.color)][square_to]
+        else:
+            score += values[index][square_to]
+        if flag == CASTLING:
+            rook_values = values[piece_index(ROOK, figure.color)]
+            score += rook_values[rook_to_square] - rook_values[rook_square]
+        self.score = score
+        if self.accumulator is not None:
+            self._push_accumulator(move, figure, captured, captured_square)
+
+        self._en_passant_square = None
+        if type(figure) == Pawn and abs(square_to - square_from) == 2 * BOARD_SIDE_SIZE:
+            self._en_passant_square = (square_from + square_to) // 2
+            state_key ^= self._en_passant_key(self._en_passant_square, invert_color(color))
+        if self.castling_rights:
+            masks = SQUARE_CASTLING_MASKS
+            castling_rights = self.castling_rights & masks[square_from] & masks[square_to]
+            if type(figure) == King:
+                castling_rights &= ~COLOR_CASTLING_RIGHTS[figure.color.value]
+            state_key ^= CASTLING_KEYS[self.castling_rights] ^ CASTLING_KEYS[castling_rights]
+            self.castling_rights = castling_rights
+        self._state_key = state_key
+        self._current_step_player = invert_color(self._current_step_player)
+
+    def _push_accumulator(self, move: Move, figure, captured, captured_square: int):
+        """Features of the network input the move changes, as piece index * 64 + square"""
+        index = figure_piece_index(figure) * SQUARES_COUNT
+        removed = [index + move.from_square]
+        if captured is not None:
+            removed.append(figure_piece_index(captured) * SQUARES_COUNT + captured_square)
+        if move.flag == PROMOTION:
+            added = [piece_index(move.promotion, figure.color) * SQUARES_COUNT + move.to_square]
+        else:
+            added = [index + move.to_square]
+        if move.flag == CASTLING:
+            rook_square, rook_to_square = get_castling_rook_squares(move.from_square, move.to_square)
+            rook_index = piece_index(ROOK, figure.color) * SQUARES_COUNT
+            removed.append(rook_index + rook_square)
+            added.append(rook_index + rook_to_square)
+        self.accumulator.push(added, removed)
+
+    def unmake_move(self):
+        """Take back the last move played with make_move"""
+        move, figure, captured, en_passant_square, castling_rights, state_key, self.score = self.undo_stack.pop()
+        board = self.board
+        square_from, square_to, flag = move & MOVE_SQUARE_MASK, move >> MOVE_SQUARE_BITS & MOVE_SQUARE_MASK, \
+            move >> MOVE_FLAG_SHIFT & MOVE_FLAG_MASK
+
+        self._current_step_player = invert_color(self._current_step_player)
+        self._en_passant_square = en_passant_square
+        self.castling_rights = castling_rights
+        self._state_key = state_key
+
+        if flag == CASTLING:
+            rook_square, rook_to_square = get_castling_rook_squares(square_from, square_to)
+            board.move_figure_by_square(rook_to_square, rook_square)
+
+        # The moved figure object is put back, which also undoes a promotion
+        board.set_figure(square_from, figure)
+        if flag == EN_PASSANT:
+            board.set_figure(square_to, None)
+            board.set_figure(square_index(square_x(square_to), square_y(square_from)), captured)
+        else:
+            board.set_figure(square_to, captured)
+        if self.accumulator is not None:
+            self.accumulator.pop(self)
 
-        if self.was_figure_moved is None:
-            self.was_figure_moved = {}
+    def make_null_move(self):
+        """Pass the turn, used by the search to test whether the position is good even without a move"""
+        self.undo_stack.append((
+            None, None, None, self._en_passant_square, self.castling_rights, self._state_key, self.score
+        ))
+        self._state_key ^= SIDE_KEY ^ self._en_passant_key(self._en_passant_square, self._current_step_player)
+        self._en_passant_square = None
+        self._current_step_player = invert_color(self._current_step_player)
 
-            for row in self.board.board:
-                for cell in row:
-                    figure = cell.content
-                    if figure is not None:
-                        self.was_figure_moved[figure] = False
+    def unmake_null_move(self):
+        _, _, _, self._en_passant_square, self.castling_rights, self._state_key, _ = self.undo_stack.pop()
+        self._current_step_player = invert_color(self._current_step_player)
 
     @property
     def winner(self):
@@ -1,6 +1,7 @@
 from abc import ABC
 
 from chess.models.chess.board import Board
+from chess.models.chess.fen import START_FEN, parse_fen
 from chess.models.chess.game_mode import GameMode
 from chess.models.chess.game_state import GameState
 
@@ -28,3 +29,10 @@ class DebugGame(Game):
 
         self.game_mode = GameMode(False)
         self.game_state = GameState(board=self.board)
+
+
+class FenGame(Game):
+    def __init__(self, fen: str = START_FEN):
+        self.game_state = parse_fen(fen)
+        self.board = self.game_state.board
+        self.game_mode = GameMode(True)
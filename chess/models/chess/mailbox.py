@@ -0,0 +1,53 @@
+# Mailbox board representation
+#
+# One byte per square, indexed by the square like the bitboards: EMPTY or the piece index + 1.
+# The position of the figures is 64 bytes: it copies and pickles as one object. Squares are
+# checked against the board bounds where they come from the players, so no sentinel frame is kept.
+
+from chess.models.chess.bitboard import PIECE_FIGURES, SQUARES_COUNT
+
+MAILBOX_SIZE = SQUARES_COUNT
+
+EMPTY = 0
+
+_EMPTY_CELLS = bytes(MAILBOX_SIZE)
+
+# Shared figure of every cell value
+CELL_FIGURES = (None,) + PIECE_FIGURES
+
+
+class Mailbox:
+    __slots__ = ('cells',)
+
+    def __init__(self, cells: bytes | bytearray | None = None):
+        if cells is None:
+            cells = _EMPTY_CELLS
+        elif len(cells) != MAILBOX_SIZE:
+            raise ValueError(f'Mailbox must have {MAILBOX_SIZE} cells. Got {len(cells)}')
+        self.cells = bytearray(cells)
+
+    def copy(self) -> 'Mailbox':
+        return Mailbox(self.cells)
+
+    def get_piece(self, square: int) -> int | None:
+        """Piece index of the figure on the square"""
+        cell = self.cells[square]
+        return cell - 1 if cell != EMPTY else None
+
+    def set_piece(self, square: int, piece: int | None):
+        self.cells[square] = piece + 1 if piece is not None else EMPTY
+
+    def iter_pieces(self):
+        """Yield squares and piece indexes of the figures"""
+        for square, cell in enumerate(self.cells):
+            if cell != EMPTY:
+                yield square, cell - 1
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Mailbox) and self.cells == other.cells
+
+    def __getstate__(self):
+        return bytes(self.cells)
+
+    def __setstate__(self, state: bytes):
+        self.cells = bytearray(state)
@@ -0,0 +1,108 @@
+# Engine move representation
+
+from array import array
+from functools import partial
+
+from chess.models.chess.bitboard import KNIGHT, square_name, square_index, square_y
+from chess.models.chess.constants import LEFT_BORDER, RIGHT_BORDER
+
+NORMAL = 0
+PROMOTION = 1
+EN_PASSANT = 2
+CASTLING = 3
+
+PROMOTION_SYMBOLS = 'pnbrqk'
+
+# 16 bit packed move: from square, to square, flag and the promotion kind starting from the knight
+MOVE_SQUARE_BITS = 6
+MOVE_SQUARE_MASK = 0x3F
+MOVE_FLAG_SHIFT = 12
+MOVE_FLAG_MASK = 3
+MOVE_PROMOTION_SHIFT = 14
+NO_MOVE = 0
+
+
+class Move(int):
+    """Move packed into 16 bits, moves compare and hash as integers"""
+    __slots__ = ()
+
+    def __new__(cls, from_square: int, to_square: int, flag: int = NORMAL, promotion: int | None = None) -> 'Move':
+        code = from_square | to_square << MOVE_SQUARE_BITS | flag << MOVE_FLAG_SHIFT
+        if promotion is not None:
+            code |= promotion - KNIGHT << MOVE_PROMOTION_SHIFT
+        return int.__new__(cls, code)
+
+    @property
+    def from_square(self) -> int:
+        return self & MOVE_SQUARE_MASK
+
+    @property
+    def to_square(self) -> int:
+        return self >> MOVE_SQUARE_BITS & MOVE_SQUARE_MASK
+
+    @property
+    def flag(self) -> int:
+        return self >> MOVE_FLAG_SHIFT & MOVE_FLAG_MASK
+
+    @property
+    def promotion(self) -> int | None:
+        """Figure kind the pawn turns into, set for promotions only"""
+        if self >> MOVE_FLAG_SHIFT & MOVE_FLAG_MASK != PROMOTION:
+            return None
+        return (self >> MOVE_PROMOTION_SHIFT) + KNIGHT
+
+    def __reduce__(self):
+        return decode_move, (int(self),)
+
+    def __repr__(self) -> str:
+        return f'Move({self.from_square}, {self.to_square}, {self.flag}, {self.promotion})'
+
+
+class MoveList(array):
+    """Moves stored as their 16 bit codes, indexing and iterating give Move objects"""
+
+    def __new__(cls, moves=()):
+        return super().__new__(cls, 'H', moves)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return MoveList(super().__getitem__(index))
+        return _decode(super().__getitem__(index))
+
+    def __iter__(self):
+        return map(_decode, super().__iter__())
+
+    def __repr__(self) -> str:
+        return f'MoveList({list(self)})'
+
+
+def move_name(move: Move) -> str:
+    """Coordinate notation of the move, e.g. e2e4 or a7a8q"""
+    name = square_name(move.from_square) + square_name(move.to_square)
+    if move.promotion is not None:
+        name += PROMOTION_SYMBOLS[move.promotion]
+    return name
+
+
+def encode_move(move: Move) -> int:
+    return int(move)
+
+
+# Move of the code without a Python level call
+_decode = partial(int.__new__, Move)
+
+
+def decode_move(code: int) -> Move:
+    return _decode(code)
+
+
+def get_castling_squares(king_square: int, rook_square: int) -> tuple[int, int]:
+    """The king steps two squares towards the rook, the rook lands on the square the king crossed"""
+    direction = 1 if rook_square > king_square else -1
+    return king_square + 2 * direction, king_square + direction
+
+
+def get_castling_rook_squares(king_square: int, king_to_square: int) -> tuple[int, int]:
+    """Squares the rook moves from and to when the king castles"""
+    rook_square = square_index(RIGHT_BORDER if king_to_square > king_square else LEFT_BORDER, square_y(king_square))
+    return rook_square, get_castling_squares(king_square, rook_square)[1]
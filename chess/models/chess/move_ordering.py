@@ -0,0 +1,115 @@
+# Search move ordering
+#
+# Moves are handed out in stages: the hash move, captures and promotions by MVV-LVA, the killer
+# moves of the ply, the quiet moves by their history score, then the captures losing material.
+# A stage is only scored and sorted when the search gets to it, so a cutoff on an early move skips
+# the work for the rest.
+
+from typing import Iterable, Iterator
+
+from chess.models.chess.bitboard import SQUARES_COUNT, PAWN, FIGURE_KINDS
+from chess.models.chess.evaluation import FIGURE_VALUES
+from chess.models.chess.figures import FigureColor
+from chess.models.chess.game_state import GameState
+from chess.models.chess.move import Move, MoveList, MOVE_SQUARE_BITS, MOVE_SQUARE_MASK, MOVE_FLAG_SHIFT, \
+    MOVE_FLAG_MASK, NORMAL, PROMOTION, EN_PASSANT
+from chess.models.chess.see import static_exchange
+
+KILLERS_COUNT = 2
+# Histories are halved when a score gets above it, so old cutoffs fade out
+HISTORY_LIMIT = 1 << 20
+
+_MOVES_COUNT = SQUARES_COUNT * SQUARES_COUNT
+_MOVE_SQUARES_MASK = _MOVES_COUNT - 1
+
+
+def get_capture_score(game_state: GameState, move: Move) -> int:
+    """Most valuable victim first, the least valuable attacker breaks ties"""
+    board = game_state.board
+    attacker = FIGURE_KINDS[type(board.get_figure(move.from_square))]
+    if move.flag == EN_PASSANT:
+        victim_value = FIGURE_VALUES[PAWN]
+    else:
+        victim = board.get_figure(move.to_square)
+        victim_value = FIGURE_VALUES[FIGURE_KINDS[type(victim)]] if victim is not None else 0
+    if move.flag == PROMOTION:
+        victim_value += FIGURE_VALUES[move.promotion]
+    return victim_value * 8 - attacker
+
+
+def is_losing_capture(game_state: GameState, move: Move) -> bool:
+    if move.flag != NORMAL:
+        return False
+    board = game_state.board
+    attacker = board.get_figure(move.from_square)
+    victim = board.get_figure(move.to_square)
+    # Taking a figure at least as valuable can't lose material, the exchange is only counted otherwise
+    if FIGURE_VALUES[FIGURE_KINDS[type(attacker)]] <= FIGURE_VALUES[FIGURE_KINDS[type(victim)]]:
+        return False
+    return static_exchange(board, move) < 0
+
+
+class MoveOrdering:
+    def __init__(self, max_ply: int):
+        self.killers: list[list[Move | None]] = [[None] * KILLERS_COUNT for _ in range(max_ply + 1)]
+        self.history = [0] * (_MOVES_COUNT * len(FigureColor))
+
+    def new_search(self):
+        for killers in self.killers:
+            killers[:] = [None] * KILLERS_COUNT
+        self.history = [score // 2 for score in self.history]
+
+    def is_tactical(self, game_state: GameState, move: Move) -> bool:
+        flag = move >> MOVE_FLAG_SHIFT & MOVE_FLAG_MASK
+        return flag == PROMOTION or flag == EN_PASSANT \
+            or game_state.board.occupancy >> (move >> MOVE_SQUARE_BITS & MOVE_SQUARE_MASK) & 1 == 1
+
+    def update_cutoff(self, color: FigureColor, move: Move, ply: int, depth: int):
+        """Remember a quiet move that caused a beta cutoff"""
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+
+        index = color.value * _MOVES_COUNT + (move & _MOVE_SQUARES_MASK)
+        self.history[index] += depth * depth
+        if self.history[index] > HISTORY_LIMIT:
+            self.history = [score // 2 for score in self.history]
+
+    def get_history_score(self, color: FigureColor, move: Move) -> int:
+        # The from and to squares of the code are the index among the moves of one color
+        return self.history[color.value * _MOVES_COUNT + (move & _MOVE_SQUARES_MASK)]
+
+    def order_moves(self, game_state: GameState, moves: MoveList, ply: int,
+                    hash_move: Move | None = None) -> Iterator[Move]:
+        if hash_move is not None and hash_move in moves:
+            yield hash_move
+
+        tactical, quiet = [], []
+        for move in moves:
+            if move == hash_move:
+                continue
+            if self.is_tactical(game_state, move):
+                tactical.append(move)
+            else:
+                quiet.append(move)
+
+        losing = []
+        for capture in self.order_captures(game_state, tactical):
+            if is_losing_capture(game_state, capture):
+                losing.append(capture)
+            else:
+                yield capture
+
+        for killer in self.killers[ply]:
+            if killer is not None and killer != hash_move and killer in quiet:
+                quiet.remove(killer)
+                yield killer
+
+        color = game_state.current_step_player
+        quiet.sort(key=lambda quiet_move: self.get_history_score(color, quiet_move), reverse=True)
+        yield from quiet
+        yield from losing
+
+    def order_captures(self, game_state: GameState, moves: Iterable[Move]) -> list[Move]:
+        return sorted(moves, key=lambda capture: get_capture_score(game_state, capture), reverse=True)
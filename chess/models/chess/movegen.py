@@ -0,0 +1,296 @@
+# Legal move generation
+#
+# Moves are generated straight from the bitboards. Check evasions are restricted to
+# capturing the checker or blocking the line to the king, pinned figures to the line
+# between their king and the pinner, so no move is played to test king safety.
+
+from chess.models.chess.attacks import KNIGHT_ATTACKS, KING_ATTACKS, PAWN_ATTACKS, BETWEEN_SQUARES, ROOK_TABLES, \
+    ROOK_MASKS, BISHOP_TABLES, BISHOP_MASKS
+from chess.models.chess.bitboard import PAWN, KNIGHT, BISHOP, ROOK, QUIN, KING, KINDS_COUNT, SQUARES_COUNT, \
+    FIGURE_KINDS, FULL_BITBOARD, EMPTY_BITBOARD, piece_index, square_index, square_x, lsb_square, iter_squares
+from chess.models.chess.board import Board
+from chess.models.chess.constants import LEFT_BORDER, RIGHT_BORDER, BOARD_SIDE_SIZE
+from chess.models.chess.figures import FigureColor
+from chess.models.chess.game_state import GameState, COLOR_CASTLING_RIGHTS, castling_right
+from chess.models.chess.move import Move, MoveList, MOVE_SQUARE_BITS, NORMAL, PROMOTION, EN_PASSANT, CASTLING, \
+    get_castling_squares
+from chess.models.chess.utils import get_side_by_color
+from chess.utils.utils import invert_color, get_direction_by_color
+
+PROMOTION_KINDS = (QUIN, ROOK, BISHOP, KNIGHT)
+
+# The king needs room to step two squares towards the rook and let the rook jump over it
+CASTLING_MIN_DISTANCE = 3
+
+
+def _attackers_to(bitboards: list[int], square: int, color_value: int, occupancy: int) -> int:
+    base = color_value * KINDS_COUNT
+    queens = bitboards[base + QUIN]
+    # A pawn attacks the square when a pawn of the other color on the square would attack the pawn
+    return PAWN_ATTACKS[1 - color_value][square] & bitboards[base + PAWN] \
+        | KNIGHT_ATTACKS[square] & bitboards[base + KNIGHT] \
+        | KING_ATTACKS[square] & bitboards[base + KING] \
+        | ROOK_TABLES[square][occupancy & ROOK_MASKS[square]] & (bitboards[base + ROOK] | queens) \
+        | BISHOP_TABLES[square][occupancy & BISHOP_MASKS[square]] & (bitboards[base + BISHOP] | queens)
+
+
+def get_attackers(board: Board, square: int, color: FigureColor, occupancy: int | None = None) -> int:
+    """Bitboard of the figures of the color attacking the square"""
+    if occupancy is None:
+        occupancy = board.occupancy
+    return _attackers_to(board.bitboards, square, color.value, occupancy)
+
+
+def is_square_attacked(board: Board, square: int, color: FigureColor) -> bool:
+    return _attackers_to(board.bitboards, square, color.value, board.occupancy) != EMPTY_BITBOARD
+
+
+def is_in_check(game_state: GameState, color: FigureColor | None = None) -> bool:
+    if color is None:
+        color = game_state.current_step_player
+    board = game_state.board
+    king_square = board.get_king_square(color)
+    if king_square is None:
+        return False
+    return is_square_attacked(board, king_square, invert_color(color))
+
+
+def get_castling_rooks_squares(game_state: GameState, color: FigureColor) -> list[int]:
+    """Squares of the rooks the king of the color still has the right to castle with"""
+    castling_rights = game_state.castling_rights
+    if not castling_rights & COLOR_CASTLING_RIGHTS[color.value]:
+        return []
+    # A right is only kept while the king and the rook have not moved, so both stand on their initial squares
+    king_square = game_state.board.get_king_square(color)
+    row = get_side_by_color(color)
+
+    rooks_squares = []
+    for x in (LEFT_BORDER, RIGHT_BORDER):
+        if not castling_rights & castling_right(color, x):
+            continue
+        if abs(x - square_x(king_square)) < CASTLING_MIN_DISTANCE:
+            continue
+        rooks_squares.append(square_index(x, row))
+    return rooks_squares
+
+
+def _add_pawn_moves(moves: MoveList, square_from: int, targets: int, promotion_row: int):
+    for square_to in iter_squares(targets):
+        if square_to // BOARD_SIDE_SIZE == promotion_row:
+            for kind in PROMOTION_KINDS:
+                moves.append(Move(square_from, square_to, PROMOTION, kind))
+        else:
+            moves.append(square_from | square_to << MOVE_SQUARE_BITS)
+
+
+def generate_legal_moves(game_state: GameState, color: FigureColor | None = None,
+                         tactical_only: bool = False) -> MoveList:
+    """All legal moves of the color, the side to move by default. Tactical ones are captures and promotions"""
+    if color is None:
+        color = game_state.current_step_player
+    board = game_state.board
+    bitboards = board.bitboards
+    occupancy = board.occupancy
+    us, them = color.value, 1 - color.value
+    base, enemy_base = us * KINDS_COUNT, them * KINDS_COUNT
+    own = board.color_bitboards[us]
+    enemy = board.color_bitboards[them]
+
+    # Plain moves are stored as their codes, no Move object is made until the list is read
+    moves = MoveList()
+    # Squares that answer a check, all of them when not in check
+    evasion = FULL_BITBOARD
+    targets = enemy if tactical_only else FULL_BITBOARD & ~own
+    pinned = EMPTY_BITBOARD
+    pin_lines = {}
+
+    king_bitboard = bitboards[base + KING]
+    king_square = None
+    checkers = EMPTY_BITBOARD
+    if king_bitboard:
+        king_square = lsb_square(king_bitboard)
+        checkers = _attackers_to(bitboards, king_square, them, occupancy)
+
+        # Sliding attackers may not see through the king while it steps back along their line
+        occupancy_without_king = occupancy ^ king_bitboard
+        for square_to in iter_squares(KING_ATTACKS[king_square] & targets):
+            if not _attackers_to(bitboards, square_to, them, occupancy_without_king):
+                moves.append(king_square | square_to << MOVE_SQUARE_BITS)
+
+        if checkers & (checkers - 1):
+            # Double check, only the king can move
+            return moves
+        if checkers:
+            evasion = checkers | BETWEEN_SQUARES[king_square][lsb_square(checkers)]
+            targets &= evasion
+
+        enemy_queens = bitboards[enemy_base + QUIN]
+        snipers = ROOK_TABLES[king_square][0] & (bitboards[enemy_base + ROOK] | enemy_queens) \
+            | BISHOP_TABLES[king_square][0] & (bitboards[enemy_base + BISHOP] | enemy_queens)
+        for sniper_square in iter_squares(snipers):
+            between = BETWEEN_SQUARES[king_square][sniper_square]
+            blockers = between & occupancy
+            if blockers and not blockers & (blockers - 1) and blockers & own:
+                pinned |= blockers
+                pin_lines[lsb_square(blockers)] = between | 1 << sniper_square
+
+    # Pawns
+    step = get_direction_by_color(color) * BOARD_SIDE_SIZE
+    start_row = get_side_by_color(color) + get_direction_by_color(color)
+    promotion_row = get_side_by_color(invert_color(color))
+    for square in iter_squares(bitboards[base + PAWN]):
+        pawn_targets = PAWN_ATTACKS[us][square] & enemy
+        square_to = square + step
+        if 0 <= square_to < SQUARES_COUNT and not occupancy >> square_to & 1:
+            # Only promotions are tactical pushes
+            if not tactical_only or square_to // BOARD_SIDE_SIZE == promotion_row:
+                pawn_targets |= 1 << square_to
+            square_to += step
+            if not tactical_only and square // BOARD_SIDE_SIZE == start_row and not occupancy >> square_to & 1:
+                pawn_targets |= 1 << square_to
+
+        pawn_targets &= evasion
+        if pinned >> square & 1:
+            pawn_targets &= pin_lines[square]
+        _add_pawn_moves(moves, square, pawn_targets, promotion_row)
+
+    en_passant_square = game_state.en_passant_square
+    if en_passant_square is not None:
+        captured_square = en_passant_square - step
+        if bitboards[enemy_base + PAWN] >> captured_square & 1 and not occupancy >> en_passant_square & 1:
+            for square in iter_squares(PAWN_ATTACKS[them][en_passant_square] & bitboards[base + PAWN]):
+                if king_square is not None:
+                    # Two pawns leave the board line at once, so check the king on the position after the capture
+                    after = occupancy ^ (1 << square) ^ (1 << captured_square) | (1 << en_passant_square)
+                    enemy_pawns = bitboards[enemy_base + PAWN] & ~(1 << captured_square)
+                    enemy_queens = bitboards[enemy_base + QUIN]
+                    if PAWN_ATTACKS[us][king_square] & enemy_pawns \
+                            or KNIGHT_ATTACKS[king_square] & bitboards[enemy_base + KNIGHT] \
+                            or ROOK_TABLES[king_square][after & ROOK_MASKS[king_square]] \
+                            & (bitboards[enemy_base + ROOK] | enemy_queens) \
+                            or BISHOP_TABLES[king_square][after & BISHOP_MASKS[king_square]] \
+                            & (bitboards[enemy_base + BISHOP] | enemy_queens):
+                        continue
+                moves.append(Move(square, en_passant_square, EN_PASSANT))
+
+    # Knights, bishops, rooks and quins
+    for square in iter_squares(bitboards[base + KNIGHT] & ~pinned):
+        for square_to in iter_squares(KNIGHT_ATTACKS[square] & targets):
+            moves.append(square | square_to << MOVE_SQUARE_BITS)
+
+    for kind in (BISHOP, ROOK, QUIN):
+        for square in iter_squares(bitboards[base + kind]):
+            if kind == BISHOP:
+                attacks = BISHOP_TABLES[square][occupancy & BISHOP_MASKS[square]]
+            elif kind == ROOK:
+                attacks = ROOK_TABLES[square][occupancy & ROOK_MASKS[square]]
+            else:
+                attacks = BISHOP_TABLES[square][occupancy & BISHOP_MASKS[square]] \
+                    | ROOK_TABLES[square][occupancy & ROOK_MASKS[square]]
+            attacks &= targets
+            if pinned >> square & 1:
+                attacks &= pin_lines[square]
+            for square_to in iter_squares(attacks):
+                moves.append(square | square_to << MOVE_SQUARE_BITS)
+
+    if king_square is not None and not checkers and not tactical_only:
+        _add_castling_moves(moves, game_state, color, king_square)
+
+    return moves
+
+
+def _add_castling_moves(moves: MoveList, game_state: GameState, color: FigureColor, king_square: int):
+    """Castling moves of the king that is not in check"""
+    bitboards = game_state.board.bitboards
+    occupancy = game_state.board.occupancy
+    them = 1 - color.value
+    for rook_square in get_castling_rooks_squares(game_state, color):
+        if BETWEEN_SQUARES[king_square][rook_square] & occupancy:
+            continue
+        king_to, _ = get_castling_squares(king_square, rook_square)
+        direction = 1 if king_to > king_square else -1
+        if _attackers_to(bitboards, king_square + direction, them, occupancy) \
+                or _attackers_to(bitboards, king_to, them, occupancy):
+            continue
+        moves.append(Move(king_square, king_to, CASTLING))
+
+
+def _get_pawn_move(game_state: GameState, color: FigureColor, square_from: int, square_to: int,
+                   promotion: int) -> Move | None:
+    """Pawn move between the squares the pawn can make ignoring its king"""
+    board = game_state.board
+    us = color.value
+    to_bit = 1 << square_to
+    step = get_direction_by_color(color) * BOARD_SIDE_SIZE
+    flag = NORMAL
+    if PAWN_ATTACKS[us][square_from] & to_bit:
+        if square_to == game_state.en_passant_square:
+            if not board.bitboards[piece_index(PAWN, invert_color(color))] >> square_to - step & 1:
+                return None
+            flag = EN_PASSANT
+        elif not board.color_bitboards[1 - us] & to_bit:
+            return None
+    elif board.occupancy & to_bit:
+        return None
+    elif square_to == square_from + 2 * step:
+        start_row = get_side_by_color(color) + get_direction_by_color(color)
+        if square_from // BOARD_SIDE_SIZE != start_row or board.occupancy >> square_from + step & 1:
+            return None
+    elif square_to != square_from + step:
+        return None
+
+    if square_to // BOARD_SIDE_SIZE == get_side_by_color(invert_color(color)):
+        return Move(square_from, square_to, PROMOTION, promotion) if promotion in PROMOTION_KINDS else None
+    return Move(square_from, square_to, flag)
+
+
+def get_legal_move(game_state: GameState, square_from: int, square_to: int, promotion: int = QUIN) -> Move | None:
+    """Legal move of the figure on the square, found without generating the moves of the other figures"""
+    # Squares come from the players, the ones off the board would wrap around the board arrays
+    if not (0 <= square_from < SQUARES_COUNT and 0 <= square_to < SQUARES_COUNT):
+        return None
+    board = game_state.board
+    figure = board.get_figure(square_from)
+    if figure is None:
+        return None
+    color = figure.color
+    to_bit = 1 << square_to
+    if board.color_bitboards[color.value] & to_bit:
+        return None
+    occupancy = board.occupancy
+
+    kind = FIGURE_KINDS[type(figure)]
+    if kind == PAWN:
+        move = _get_pawn_move(game_state, color, square_from, square_to, promotion)
+    else:
+        if kind == KNIGHT:
+            attacks = KNIGHT_ATTACKS[square_from]
+        elif kind == BISHOP:
+            attacks = BISHOP_TABLES[square_from][occupancy & BISHOP_MASKS[square_from]]
+        elif kind == ROOK:
+            attacks = ROOK_TABLES[square_from][occupancy & ROOK_MASKS[square_from]]
+        elif kind == QUIN:
+            attacks = BISHOP_TABLES[square_from][occupancy & BISHOP_MASKS[square_from]] \
+                | ROOK_TABLES[square_from][occupancy & ROOK_MASKS[square_from]]
+        else:
+            attacks = KING_ATTACKS[square_from]
+            if not attacks & to_bit:
+                if is_in_check(game_state, color):
+                    return None
+                # Castling squares are checked for attacks when the moves are made
+                castling = MoveList()
+                _add_castling_moves(castling, game_state, color, square_from)
+                return next((move for move in castling if move.to_square == square_to), None)
+        move = Move(square_from, square_to) if attacks & to_bit else None
+    if move is None:
+        return None
+
+    # The move is played to see whether it leaves the king in check
+    game_state.make_move(move)
+    in_check = is_in_check(game_state, color)
+    game_state.unmake_move()
+    return None if in_check else move
+
+
+def is_legal_move(game_state: GameState, square_from: int, square_to: int) -> bool:
+    return get_legal_move(game_state, square_from, square_to) is not None
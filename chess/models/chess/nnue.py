@@ -0,0 +1,133 @@
+# Neural network evaluation, NNUE style
+#
+# Input features are the figures on their squares, 12 pieces by 64 squares, seen from both sides:
+# the black view swaps the colors and mirrors the board. The first layer output of every view,
+# the accumulator, is a sum of weight rows of the figures on the board, so a move only adds and
+# subtracts the rows of the figures it moves. Later layers are small and run with NumPy:
+#
+#   accumulators (side to move, other side) -> clipped ReLU -> hidden -> clipped ReLU -> score
+#
+# Weights are loaded from a local .npz file with the arrays of NETWORK_ARRAYS, the score is in
+# centipawns from the point of view of the side to move.
+
+import numpy as np
+
+from chess.models.chess.bitboard import KINDS_COUNT, MIRROR_SQUARE, PIECES_COUNT, SQUARES_COUNT, iter_squares
+from chess.models.chess.figures import FigureColor
+from chess.models.chess.game_state import GameState
+
+FEATURES_COUNT = PIECES_COUNT * SQUARES_COUNT
+NETWORK_ARRAYS = ('feature_weights', 'feature_bias', 'hidden_weights', 'hidden_bias', 'output_weights', 'output_bias')
+
+
+def feature_index(piece: int, square: int) -> int:
+    return piece * SQUARES_COUNT + square
+
+
+def _mirrored_features() -> np.ndarray:
+    """Feature of the black view for every feature of the white view"""
+    features = np.zeros(FEATURES_COUNT, dtype=np.intp)
+    for piece in range(PIECES_COUNT):
+        for square in range(SQUARES_COUNT):
+            mirrored_piece = (piece + KINDS_COUNT) % PIECES_COUNT
+            features[feature_index(piece, square)] = feature_index(mirrored_piece, square ^ MIRROR_SQUARE)
+    return features
+
+
+class NeuralNetwork:
+    def __init__(self, feature_weights: np.ndarray, feature_bias: np.ndarray, hidden_weights: np.ndarray,
+                 hidden_bias: np.ndarray, output_weights: np.ndarray, output_bias: np.ndarray):
+        accumulator_size = feature_bias.shape[0]
+        hidden_size = hidden_bias.shape[0]
+        if feature_weights.shape != (FEATURES_COUNT, accumulator_size) \
+                or hidden_weights.shape != (2 * accumulator_size, hidden_size) \
+                or output_weights.shape != (hidden_size,) or np.size(output_bias) != 1:
+            raise ValueError('Neural network layers shapes do not match')
+
+        self.feature_weights = feature_weights.astype(np.float32)
+        self.feature_bias = feature_bias.astype(np.float32)
+        self.hidden_weights = hidden_weights.astype(np.float32)
+        self.hidden_bias = hidden_bias.astype(np.float32)
+        self.output_weights = output_weights.astype(np.float32)
+        self.output_bias = float(np.asarray(output_bias).item())
+        # Weight rows of both views by the white view feature, shape (768, 2, accumulator size)
+        self.view_weights = np.stack(
+            (self.feature_weights, self.feature_weights[_mirrored_features()]), axis=1
+        )
+
+    @property
+    def accumulator_size(self) -> int:
+        return self.feature_bias.shape[0]
+
+    @staticmethod
+    def load(path: str) -> 'NeuralNetwork':
+        with np.load(path) as arrays:
+            missing = [name for name in NETWORK_ARRAYS if name not in arrays]
+            if missing:
+                raise ValueError(f'Neural network file {path} misses arrays: ' + ', '.join(missing))
+            return NeuralNetwork(*(arrays[name] for name in NETWORK_ARRAYS))
+
+    def save(self, path: str):
+        np.savez(path, **{name: getattr(self, name) for name in NETWORK_ARRAYS})
+
+    @staticmethod
+    def random(accumulator_size: int = 64, hidden_size: int = 16, seed: int = 0) -> 'NeuralNetwork':
+        """Untrained network, a starting point for training"""
+        generator = np.random.default_rng(seed)
+        return NeuralNetwork(
+            generator.normal(0, 0.1, (FEATURES_COUNT, accumulator_size)),
+            np.zeros(accumulator_size),
+            generator.normal(0, 1 / np.sqrt(2 * accumulator_size), (2 * accumulator_size, hidden_size)),
+            np.zeros(hidden_size),
+            generator.normal(0, 100, hidden_size),
+            np.zeros(1)
+        )
+
+    def propagate(self, own: np.ndarray, other: np.ndarray) -> int:
+        """Score of the side whose view is the own accumulator"""
+        inputs = np.clip(np.concatenate((own, other)), 0, 1)
+        hidden = np.clip(inputs @ self.hidden_weights + self.hidden_bias, 0, 1)
+        return int(hidden @ self.output_weights + self.output_bias)
+
+
+class Accumulator:
+    """First layer output of both views, with a stack of the values before every played move"""
+
+    def __init__(self, network: NeuralNetwork, game_state: GameState):
+        self.network = network
+        self._stack: list[np.ndarray] = []
+        self.refresh(game_state)
+
+    def refresh(self, game_state: GameState):
+        """Recompute from all the figures on the board"""
+        features = [
+            feature_index(piece, square)
+            for piece, bitboard in enumerate(game_state.board.bitboards)
+            for square in iter_squares(bitboard)
+        ]
+        network = self.network
+        self.values = network.view_weights[features].sum(axis=0) + network.feature_bias
+        self._stack.clear()
+
+    def push(self, added: list[int], removed: list[int]):
+        """Update by the features of a move, the previous values are kept for pop"""
+        self._stack.append(self.values)
+        weights = self.network.view_weights
+        self.values = self.values + weights[added].sum(axis=0) - weights[removed].sum(axis=0)
+
+    def pop(self, game_state: GameState):
+        """Values before the move the game state has just taken back"""
+        if self._stack:
+            self.values = self._stack.pop()
+        else:
+            # The move was played before the network was enabled
+            self.refresh(game_state)
+
+    def evaluate(self, color: FigureColor) -> int:
+        own = 0 if color == FigureColor.WHITE else 1
+        return self.network.propagate(self.values[own], self.values[1 - own])
+
+
+def enable_neural_evaluation(game_state: GameState, network: NeuralNetwork):
+    """Evaluate the game state with the network from now on, its moves update the accumulator"""
+    game_state.accumulator = Accumulator(network, game_state)
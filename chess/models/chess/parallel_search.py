@@ -0,0 +1,117 @@
+# Parallel search, Lazy SMP
+#
+# Worker processes search the same root position independently and share one transposition table
+# in shared memory, so every worker profits from the lines the others have already searched.
+# Helpers shuffle their root moves and skip depths to spread the work. The deepest completed
+# result wins, the main worker breaks ties. A worker that dies is left out, and when none is left
+# the game process searches by itself.
+
+import multiprocessing
+import queue
+import time
+from multiprocessing.queues import Queue
+
+from chess.config.config import CONFIG
+from chess.models.chess.fen import parse_fen, to_fen
+from chess.models.chess.game_state import GameState
+from chess.models.chess.nnue import NeuralNetwork, enable_neural_evaluation
+from chess.models.chess.search import Search, SearchLimits, SearchOptions, SearchResult
+from chess.models.chess.transposition_table import SharedTranspositionTable
+
+# Seconds between the checks that the workers still searching are alive
+RESULT_POLL_SECONDS = 0.5
+
+
+def _search_worker(helper: int, table_name: str, network: NeuralNetwork | None, tasks: Queue, results: Queue):
+    # Workers share the resource tracker of the main process, which unlinks the block
+    table = SharedTranspositionTable.attach(table_name)
+    try:
+        while (task := tasks.get()) is not None:
+            search_id, fen, limits, options = task
+            game_state = parse_fen(fen)
+            if network is not None:
+                enable_neural_evaluation(game_state, network)
+            # The main process starts the generation in the table header before sending the task
+            result = Search(game_state, table, options, helper).run(limits, new_search=False)
+            results.put((search_id, helper, result))
+    finally:
+        table.close()
+
+
+class ParallelSearch:
+    def __init__(self, game_state: GameState, workers: int | None = None, size_mb: int | None = None,
+                 options: SearchOptions | None = None, network: NeuralNetwork | None = None):
+        self.game_state = game_state
+        self.workers_count = workers if workers is not None else CONFIG.search_workers
+        if self.workers_count < 1:
+            raise ValueError('Parallel search needs at least one worker. Got ' + str(self.workers_count))
+        self.options = options if options is not None else SearchOptions.from_config()
+        self.network = network
+        self.transposition_table = SharedTranspositionTable.create(size_mb)
+        # Results of an earlier search left by a worker that died after sending them are skipped
+        self._search_id = 0
+
+        context = multiprocessing.get_context()
+        self._results = context.Queue()
+        self._tasks = [context.Queue() for _ in range(self.workers_count)]
+        self._processes = [
+            context.Process(
+                target=_search_worker,
+                args=(helper, self.transposition_table.name, network, tasks, self._results),
+                daemon=True
+            )
+            for helper, tasks in enumerate(self._tasks)
+        ]
+        for process in self._processes:
+            process.start()
+
+    def run(self, limits: SearchLimits) -> SearchResult:
+        started = time.perf_counter()
+        fen = to_fen(self.game_state)
+        self.transposition_table.new_search()
+        self._search_id += 1
+        waiting = {helper for helper, process in enumerate(self._processes) if process.is_alive()}
+        for helper in waiting:
+            self._tasks[helper].put((self._search_id, fen, limits, self.options))
+
+        results = {}
+        while waiting:
+            try:
+                search_id, helper, result = self._results.get(timeout=RESULT_POLL_SECONDS)
+            except queue.Empty:
+                # A crashed or killed worker never answers
+                waiting = {helper for helper in waiting if self._processes[helper].is_alive()}
+                continue
+            if search_id == self._search_id:
+                results[helper] = result
+                waiting.discard(helper)
+
+        if not results:
+            best = self._search_in_process(limits)
+        else:
+            best_helper = max(results, key=lambda helper: (results[helper].depth, helper == 0))
+            best = results[best_helper]
+            best.nodes = sum(result.nodes for result in results.values())
+        best.seconds = time.perf_counter() - started
+        return best
+
+    def _search_in_process(self, limits: SearchLimits) -> SearchResult:
+        """Search of the main worker run by the game process itself"""
+        game_state = self.game_state.copy()
+        if self.network is not None:
+            enable_neural_evaluation(game_state, self.network)
+        return Search(game_state, self.transposition_table, self.options).run(limits, new_search=False)
+
+    def close(self):
+        for tasks in self._tasks:
+            tasks.put(None)
+        for process in self._processes:
+            process.join()
+        self.transposition_table.close()
+        self.transposition_table.unlink()
+
+    def __enter__(self) -> 'ParallelSearch':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
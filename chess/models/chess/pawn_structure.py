@@ -0,0 +1,97 @@
+# Pawn structure evaluation
+#
+# Doubled and isolated pawns are penalized, passed pawns get a bonus growing as they advance.
+# Pawn moves are rare, so the scores are cached by the pawn key of the board, the Zobrist key
+# of the pawns alone, and most positions of a search find their pawn structure in the cache.
+
+from chess.models.chess.bitboard import PAWN, SQUARES_COUNT, square_index, square_x, square_y, iter_squares, \
+    piece_index
+from chess.models.chess.board import Board
+from chess.models.chess.constants import BOARD_SIDE_SIZE
+from chess.models.chess.figures import FigureColor
+
+DOUBLED_PAWN_PENALTY = 10
+ISOLATED_PAWN_PENALTY = 15
+# Indexed by the rank of the pawn counted from its own side, the first one is 0
+PASSED_PAWN_BONUS = (0, 5, 10, 20, 35, 60, 100, 0)
+
+DEFAULT_PAWN_TABLE_SIZE = 1 << 14
+
+FILE_MASKS = [
+    sum(1 << square_index(x, y) for y in range(BOARD_SIDE_SIZE)) for x in range(BOARD_SIDE_SIZE)
+]
+ADJACENT_FILES_MASKS = [
+    (FILE_MASKS[x - 1] if x > 0 else 0) | (FILE_MASKS[x + 1] if x < BOARD_SIDE_SIZE - 1 else 0)
+    for x in range(BOARD_SIDE_SIZE)
+]
+
+
+def _passed_pawn_mask(square: int, color: FigureColor) -> int:
+    """Squares ahead of the pawn on its own and the adjacent files, an enemy pawn there stops it"""
+    x, y = square_x(square), square_y(square)
+    # White pawns go to the top row
+    rows = range(y) if color == FigureColor.WHITE else range(y + 1, BOARD_SIDE_SIZE)
+    files = FILE_MASKS[x] | ADJACENT_FILES_MASKS[x]
+    return sum(1 << square_index(0, row) for row in rows) * 0xFF & files
+
+
+# Indexed by color value, then square
+PASSED_PAWN_MASKS = [[_passed_pawn_mask(square, color) for square in range(SQUARES_COUNT)] for color in FigureColor]
+
+
+def relative_rank(square: int, color: FigureColor) -> int:
+    y = square_y(square)
+    return BOARD_SIDE_SIZE - 1 - y if color == FigureColor.WHITE else y
+
+
+def evaluate_pawns(own: int, enemy: int, color: FigureColor) -> int:
+    """Pawn structure score of the side owning the pawns"""
+    score = 0
+    for x in range(BOARD_SIDE_SIZE):
+        count = (own & FILE_MASKS[x]).bit_count()
+        if not count:
+            continue
+        score -= DOUBLED_PAWN_PENALTY * (count - 1)
+        if not own & ADJACENT_FILES_MASKS[x]:
+            score -= ISOLATED_PAWN_PENALTY * count
+    passed_masks = PASSED_PAWN_MASKS[color.value]
+    for square in iter_squares(own):
+        if not enemy & passed_masks[square]:
+            score += PASSED_PAWN_BONUS[relative_rank(square, color)]
+    return score
+
+
+def evaluate_pawn_structure(board: Board) -> int:
+    """Pawn structure score of white over black"""
+    white = board.bitboards[piece_index(PAWN, FigureColor.WHITE)]
+    black = board.bitboards[piece_index(PAWN, FigureColor.BLACK)]
+    return evaluate_pawns(white, black, FigureColor.WHITE) - evaluate_pawns(black, white, FigureColor.BLACK)
+
+
+class PawnHashTable:
+    """Pawn structure scores by the pawn key, a new structure replaces the one in its slot"""
+
+    def __init__(self, size: int = DEFAULT_PAWN_TABLE_SIZE):
+        if size <= 0 or size & size - 1:
+            raise ValueError('Pawn table size must be a power of two. Got ' + str(size))
+        self._mask = size - 1
+        self._keys: list[int | None] = [None] * size
+        self._scores = [0] * size
+        self.probes = 0
+        self.hits = 0
+
+    def get_score(self, board: Board) -> int:
+        key = board.pawn_key
+        index = key & self._mask
+        self.probes += 1
+        if self._keys[index] == key:
+            self.hits += 1
+            return self._scores[index]
+        score = evaluate_pawn_structure(board)
+        self._keys[index] = key
+        self._scores[index] = score
+        return score
+
+    @property
+    def hit_rate(self) -> float:
+        return self.hits / self.probes if self.probes else 0.0
@@ -0,0 +1,129 @@
+# Piece-square tables
+#
+# Value of every figure on every square: its material plus a bonus for a good placement, like
+# central knights, advanced pawns or a sheltered king. The score of a position is the sum over
+# the figures on the board, so a move only adds and removes the values of the squares it changes.
+#
+# Tables are written for white, the top row is the eighth rank, black uses them mirrored.
+# Values tuned by chess.tune replace the written ones when the config names their file.
+
+import numpy as np
+
+from chess.config.config import CONFIG
+from chess.models.chess.bitboard import KINDS_COUNT, MIRROR_SQUARE, PIECES_COUNT, SQUARES_COUNT, piece_index, \
+    iter_squares
+from chess.models.chess.figures import FigureColor
+
+# Indexed by figure kind: pawn, knight, bishop, rook, quin, king
+FIGURE_VALUES = (100, 320, 330, 500, 900, 0)
+
+_PAWN_TABLE = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    50, 50, 50, 50, 50, 50, 50, 50,
+    10, 10, 20, 30, 30, 20, 10, 10,
+    5, 5, 10, 25, 25, 10, 5, 5,
+    0, 0, 0, 20, 20, 0, 0, 0,
+    5, -5, -10, 0, 0, -10, -5, 5,
+    5, 10, 10, -20, -20, 10, 10, 5,
+    0, 0, 0, 0, 0, 0, 0, 0,
+)
+
+_KNIGHT_TABLE = (
+    -50, -40, -30, -30, -30, -30, -40, -50,
+    -40, -20, 0, 0, 0, 0, -20, -40,
+    -30, 0, 10, 15, 15, 10, 0, -30,
+    -30, 5, 15, 20, 20, 15, 5, -30,
+    -30, 0, 15, 20, 20, 15, 0, -30,
+    -30, 5, 10, 15, 15, 10, 5, -30,
+    -40, -20, 0, 5, 5, 0, -20, -40,
+    -50, -40, -30, -30, -30, -30, -40, -50,
+)
+
+_BISHOP_TABLE = (
+    -20, -10, -10, -10, -10, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 10, 10, 5, 0, -10,
+    -10, 5, 5, 10, 10, 5, 5, -10,
+    -10, 0, 10, 10, 10, 10, 0, -10,
+    -10, 10, 10, 10, 10, 10, 10, -10,
+    -10, 5, 0, 0, 0, 0, 5, -10,
+    -20, -10, -10, -10, -10, -10, -10, -20,
+)
+
+_ROOK_TABLE = (
+    0, 0, 0, 0, 0, 0, 0, 0,
+    5, 10, 10, 10, 10, 10, 10, 5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    -5, 0, 0, 0, 0, 0, 0, -5,
+    0, 0, 0, 5, 5, 0, 0, 0,
+)
+
+_QUIN_TABLE = (
+    -20, -10, -10, -5, -5, -10, -10, -20,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    -5, 0, 5, 5, 5, 5, 0, -5,
+    -10, 0, 5, 5, 5, 5, 0, -10,
+    -10, 0, 0, 0, 0, 0, 0, -10,
+    -20, -10, -10, -5, -5, -10, -10, -20,
+)
+
+_KING_TABLE = (
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -30, -40, -40, -50, -50, -40, -40, -30,
+    -20, -30, -30, -40, -40, -30, -30, -20,
+    -10, -20, -20, -20, -20, -20, -20, -10,
+    20, 20, 0, 0, 0, 0, 20, 20,
+    20, 30, 10, 0, 0, 10, 30, 20,
+)
+
+PLACEMENT_TABLES = (_PAWN_TABLE, _KNIGHT_TABLE, _BISHOP_TABLE, _ROOK_TABLE, _QUIN_TABLE, _KING_TABLE)
+
+# Arrays of a file saved by the tuner
+TABLES_ARRAYS = ('figure_values', 'tables')
+
+
+def load_tables(path: str) -> tuple[tuple[int, ...], tuple[tuple[int, ...], ...]]:
+    """Figure values and placement tables of a file saved by the tuner"""
+    with np.load(path) as arrays:
+        missing = [name for name in TABLES_ARRAYS if name not in arrays]
+        if missing:
+            raise ValueError(f'Piece-square tables file {path} misses arrays: ' + ', '.join(missing))
+        figure_values, tables = arrays['figure_values'], arrays['tables']
+    if figure_values.shape != (KINDS_COUNT,) or tables.shape != (KINDS_COUNT, SQUARES_COUNT):
+        raise ValueError(f'Piece-square tables file {path} has wrong shapes')
+    return tuple(int(value) for value in figure_values), tuple(tuple(int(value) for value in table) for table in tables)
+
+
+if CONFIG.tables_path is not None:
+    FIGURE_VALUES, PLACEMENT_TABLES = load_tables(CONFIG.tables_path)
+
+
+def _build_piece_square_values() -> list[tuple[int, ...]]:
+    values = [()] * PIECES_COUNT
+    for kind in range(KINDS_COUNT):
+        table, value = PLACEMENT_TABLES[kind], FIGURE_VALUES[kind]
+        values[piece_index(kind, FigureColor.WHITE)] = tuple(value + table[square] for square in range(SQUARES_COUNT))
+        values[piece_index(kind, FigureColor.BLACK)] = tuple(
+            -value - table[square ^ MIRROR_SQUARE] for square in range(SQUARES_COUNT)
+        )
+    return values
+
+
+# Signed score of a figure on a square, indexed by piece index then square: white adds, black subtracts
+PIECE_SQUARE_VALUES = _build_piece_square_values()
+
+
+def get_placement_score(bitboards: list[int]) -> int:
+    """Score of white over black counted over the whole board"""
+    return sum(
+        PIECE_SQUARE_VALUES[index][square]
+        for index, bitboard in enumerate(bitboards)
+        for square in iter_squares(bitboard)
+    )
@@ -0,0 +1,375 @@
+# Computer player search
+#
+# Negamax alpha-beta with iterative deepening over make/unmake, the principal variation search tests
+# the moves after the first one with a zero window. Every iteration starts from the best move of the
+# previous one, so a search stopped by its time or node budget still returns the best move found so
+# far. At the horizon a quiescence search plays out the captures that don't lose material, so
+# positions are only evaluated when they are quiet.
+#
+# Outside the principal variation the tree is cut selectively: null move pruning, late move
+# reductions and futility pruning, while checks are extended. Each of them is switched by Config.
+
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable
+
+from chess.config.config import CONFIG
+from chess.models.chess.bitboard import PAWN, KING, KINDS_COUNT
+from chess.models.chess.evaluation import evaluate
+from chess.models.chess.game_state import GameState
+from chess.models.chess.move import Move, PROMOTION
+from chess.models.chess.move_ordering import MoveOrdering
+from chess.models.chess.movegen import generate_legal_moves, is_in_check
+from chess.models.chess.pawn_structure import PawnHashTable
+from chess.models.chess.see import static_exchange
+from chess.models.chess.transposition_table import TranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER
+
+MAX_PLY = 64
+INFINITY = 32000
+MATE_SCORE = 31000
+# Scores beyond it are mates, their distance from the root is MATE_SCORE - abs(score) plies
+MATE_BOUND = MATE_SCORE - MAX_PLY
+DRAW_SCORE = 0
+
+# The clock is read once every that many nodes
+CHECK_LIMITS_MASK = 0x3FF
+
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_REDUCTION = 2
+# Futility margins by the remaining depth
+FUTILITY_MARGINS = (0, 200, 400)
+LMR_MIN_DEPTH = 3
+# Moves searched at full depth before the rest is reduced
+LMR_FULL_DEPTH_MOVES = 3
+# Captures which can't bring the quiescence score near alpha even with that much positional gain
+QUIESCENCE_DELTA_MARGIN = 200
+
+
+@dataclass
+class SearchLimits:
+    depth: int | None = None
+    # Seconds
+    time: float | None = None
+    nodes: int | None = None
+
+
+@dataclass
+class SearchOptions:
+    null_move_pruning: bool = True
+    late_move_reductions: bool = True
+    futility_pruning: bool = True
+    check_extensions: bool = True
+
+    @staticmethod
+    def from_config() -> 'SearchOptions':
+        return SearchOptions(
+            null_move_pruning=CONFIG.null_move_pruning,
+            late_move_reductions=CONFIG.late_move_reductions,
+            futility_pruning=CONFIG.futility_pruning,
+            check_extensions=CONFIG.check_extensions
+        )
+
+
+@dataclass
+class SearchResult:
+    move: Move | None
+    score: int
+    # Depth of the last completed iteration
+    depth: int
+    pv: list[Move] = field(default_factory=list)
+    nodes: int = 0
+    seconds: float = 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def is_mate(self) -> bool:
+        return abs(self.score) >= MATE_BOUND
+
+
+def score_to_tt(score: int, ply: int) -> int:
+    """Mate scores are stored relative to the node, not to the root"""
+    if score >= MATE_BOUND:
+        return score + ply
+    if score <= -MATE_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_tt(score: int, ply: int) -> int:
+    if score >= MATE_BOUND:
+        return score - ply
+    if score <= -MATE_BOUND:
+        return score + ply
+    return score
+
+
+def has_figures(game_state: GameState) -> bool:
+    """Whether the side to move has anything but pawns, without them a null move can miss a zugzwang"""
+    bitboards = game_state.board.bitboards
+    base = game_state.current_step_player.value * KINDS_COUNT
+    return any(bitboards[base + kind] for kind in range(PAWN + 1, KING))
+
+
+class Search:
+    def __init__(self, game_state: GameState, transposition_table: TranspositionTable | None = None,
+                 options: SearchOptions | None = None, helper: int = 0):
+        self.game_state = game_state
+        # Parallel helpers shuffle the root moves and skip depths, so they fill the shared table differently
+        self.helper = helper
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable()
+        self.options = options if options is not None else SearchOptions.from_config()
+        self.move_ordering = MoveOrdering(MAX_PLY)
+        # Pawn structure scores don't depend on the search, so the cache is kept between the runs
+        self.pawn_table = PawnHashTable()
+        self.nodes = 0
+        self._stopped = False
+        self._can_stop = False
+        self._deadline: float | None = None
+        self._max_nodes: int | None = None
+        self._root_moves: list[Move] = []
+        self._root_move: Move | None = None
+        self._root_score = -INFINITY
+        self._pv: list[list[Move]] = [[] for _ in range(MAX_PLY + 1)]
+        # Keys of the positions on the current line, to score repetitions as draws
+        self._path_keys: list[int] = []
+
+    def stop(self):
+        self._stopped = True
+
+    def run(self, limits: SearchLimits, on_iteration: Callable[[SearchResult], None] | None = None,
+            new_search: bool = True) -> SearchResult:
+        """Iterative deepening. A search sharing the table with others leaves its generation to the owner"""
+        started = time.perf_counter()
+        self.nodes = 0
+        self._stopped = False
+        self._deadline = started + limits.time if limits.time is not None else None
+        self._max_nodes = limits.nodes
+        if new_search:
+            self.transposition_table.new_search()
+        self.move_ordering.new_search()
+
+        self._root_moves = generate_legal_moves(self.game_state)
+        if not self._root_moves:
+            score = -MATE_SCORE if is_in_check(self.game_state) else DRAW_SCORE
+            return SearchResult(None, score, 0)
+
+        first_depth = 1
+        if self.helper:
+            random.Random(self.helper).shuffle(self._root_moves)
+            first_depth += self.helper % 2
+
+        result = SearchResult(self._root_moves[0], 0, 0)
+        max_depth = MAX_PLY if limits.depth is None else max(1, min(limits.depth, MAX_PLY))
+        for depth in range(min(first_depth, max_depth), max_depth + 1):
+            # The first iteration always completes, so there is a searched move to return
+            self._can_stop = depth > first_depth
+            self._root_move = None
+            self._root_score = -INFINITY
+            score = self._negamax(depth, 0, -INFINITY, INFINITY)
+
+            if self._root_move is not None:
+                completed = not self._stopped
+                result = SearchResult(
+                    self._root_move,
+                    score if completed else self._root_score,
+                    depth if completed else result.depth,
+                    list(self._pv[0]),
+                    self.nodes,
+                    time.perf_counter() - started
+                )
+                if on_iteration is not None and completed:
+                    on_iteration(result)
+                # The next iteration starts from the best move
+                self._root_moves.remove(self._root_move)
+                self._root_moves.insert(0, self._root_move)
+
+            if self._stopped or result.is_mate and MATE_SCORE - abs(result.score) <= depth:
+                break
+
+        result.nodes = self.nodes
+        result.seconds = time.perf_counter() - started
+        return result
+
+    def _check_limits(self):
+        if not self._can_stop:
+            return
+        if self._max_nodes is not None and self.nodes >= self._max_nodes:
+            self._stopped = True
+        elif self._deadline is not None and time.perf_counter() >= self._deadline:
+            self._stopped = True
+
+    def _negamax(self, depth: int, ply: int, alpha: int, beta: int, allow_null: bool = True) -> int:
+        self.nodes += 1
+        if self.nodes & CHECK_LIMITS_MASK == 0 or self._max_nodes is not None:
+            self._check_limits()
+        if self._stopped:
+            return 0
+
+        game_state = self.game_state
+        options = self.options
+        self._pv[ply] = []
+        key = game_state.position_key()
+        if ply > 0 and key in self._path_keys:
+            return DRAW_SCORE
+        if ply >= MAX_PLY:
+            return evaluate(game_state, self.pawn_table)
+
+        in_check = is_in_check(game_state)
+        if in_check and options.check_extensions:
+            depth += 1
+        if depth <= 0:
+            # The node is counted again by the quiescence search
+            self.nodes -= 1
+            return self._quiescence(ply, alpha, beta)
+
+        table = self.transposition_table
+        entry = table.probe(key)
+        hash_move = None
+        if entry is not None:
+            hash_move = entry.move
+            if ply > 0 and entry.depth >= depth:
+                score = score_from_tt(entry.score, ply)
+                if entry.bound == BOUND_EXACT \
+                        or entry.bound == BOUND_LOWER and score >= beta \
+                        or entry.bound == BOUND_UPPER and score <= alpha:
+                    return score
+
+        # Zero window nodes only need to know whether the score is above or below the bound
+        is_pv = beta - alpha > 1
+        static_score = None
+        if not is_pv and not in_check:
+            static_score = evaluate(game_state, self.pawn_table)
+
+            if options.null_move_pruning and allow_null and depth >= NULL_MOVE_MIN_DEPTH \
+                    and static_score >= beta and has_figures(game_state):
+                game_state.make_null_move()
+                self._path_keys.append(key)
+                score = -self._negamax(depth - 1 - NULL_MOVE_REDUCTION, ply + 1, -beta, -beta + 1, False)
+                self._path_keys.pop()
+                game_state.unmake_null_move()
+                if self._stopped:
+                    return 0
+                if score >= beta:
+                    # Mates found after passing the turn are not proven
+                    return beta if score >= MATE_BOUND else score
+
+        # Quiet moves can't bring a hopeless score up to alpha near the horizon
+        futile = options.futility_pruning and static_score is not None and depth < len(FUTILITY_MARGINS) \
+            and abs(alpha) < MATE_BOUND and static_score + FUTILITY_MARGINS[depth] <= alpha
+
+        if ply == 0:
+            # The root keeps the order of the previous iteration
+            moves = self._root_moves
+        else:
+            legal_moves = generate_legal_moves(game_state)
+            if not legal_moves:
+                return -MATE_SCORE + ply if in_check else DRAW_SCORE
+            moves = self.move_ordering.order_moves(game_state, legal_moves, ply, hash_move)
+
+        alpha_original = alpha
+        best_score = -INFINITY
+        best_move = None
+        moves_searched = 0
+        self._path_keys.append(key)
+        for move in moves:
+            is_quiet = not self.move_ordering.is_tactical(game_state, move)
+            game_state.make_move(move)
+            gives_check = is_quiet and is_in_check(game_state)
+
+            if futile and is_quiet and not gives_check and moves_searched > 0:
+                game_state.unmake_move()
+                best_score = max(best_score, static_score)
+                continue
+
+            new_depth = depth - 1
+            if moves_searched == 0:
+                score = -self._negamax(new_depth, ply + 1, -beta, -alpha)
+            else:
+                # The other moves only have to prove they are no better than alpha, with a zero window
+                reduction = 0
+                if options.late_move_reductions and is_quiet and not in_check and not gives_check \
+                        and depth >= LMR_MIN_DEPTH and moves_searched >= LMR_FULL_DEPTH_MOVES:
+                    reduction = 1 if moves_searched < 2 * LMR_FULL_DEPTH_MOVES or depth < 6 else 2
+                score = -self._negamax(new_depth - reduction, ply + 1, -alpha - 1, -alpha)
+                if score > alpha and reduction:
+                    score = -self._negamax(new_depth, ply + 1, -alpha - 1, -alpha)
+                if alpha < score < beta:
+                    score = -self._negamax(new_depth, ply + 1, -beta, -alpha)
+            game_state.unmake_move()
+            moves_searched += 1
+            if self._stopped:
+                break
+
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    self._pv[ply] = [move] + self._pv[ply + 1]
+                    if ply == 0:
+                        self._root_move, self._root_score = move, score
+                    if alpha >= beta:
+                        if is_quiet:
+                            self.move_ordering.update_cutoff(game_state.current_step_player, move, ply, depth)
+                        break
+        self._path_keys.pop()
+
+        if self._stopped:
+            return 0
+        if best_score >= beta:
+            bound = BOUND_LOWER
+        elif best_score > alpha_original:
+            bound = BOUND_EXACT
+        else:
+            bound = BOUND_UPPER
+        table.store(key, depth, bound, score_to_tt(best_score, ply), best_move)
+        return best_score
+
+    def _quiescence(self, ply: int, alpha: int, beta: int) -> int:
+        self.nodes += 1
+        if self.nodes & CHECK_LIMITS_MASK == 0 or self._max_nodes is not None:
+            self._check_limits()
+        if self._stopped:
+            return 0
+
+        game_state = self.game_state
+        if ply >= MAX_PLY:
+            return evaluate(game_state, self.pawn_table)
+
+        in_check = is_in_check(game_state)
+        if in_check:
+            # Every evasion is searched, a quiet position can't be assumed when in check
+            moves = generate_legal_moves(game_state)
+            if not moves:
+                return -MATE_SCORE + ply
+            moves = self.move_ordering.order_moves(game_state, moves, ply)
+            best_score = -INFINITY
+        else:
+            best_score = evaluate(game_state, self.pawn_table)
+            if best_score >= beta:
+                return best_score
+            alpha = max(alpha, best_score)
+            moves = self.move_ordering.order_captures(game_state, generate_legal_moves(game_state, tactical_only=True))
+
+        for move in moves:
+            if not in_check and move.flag != PROMOTION:
+                gain = static_exchange(game_state.board, move)
+                if gain < 0 or best_score + gain + QUIESCENCE_DELTA_MARGIN <= alpha:
+                    continue
+            game_state.make_move(move)
+            score = -self._quiescence(ply + 1, -beta, -alpha)
+            game_state.unmake_move()
+            if self._stopped:
+                return 0
+
+            if score > best_score:
+                best_score = score
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        return best_score
@@ -0,0 +1,58 @@
+# Static exchange evaluation
+#
+# Material balance of the capture sequence on one square, found from the attackers of the square
+# without playing the moves. Both sides recapture with their least valuable attacker and may stop
+# when going on loses material. Sliders behind a captured figure join the exchange.
+
+from chess.models.chess.bitboard import PAWN, KING, KINDS_COUNT, FIGURE_KINDS, lsb_square
+from chess.models.chess.board import Board
+from chess.models.chess.evaluation import FIGURE_VALUES
+from chess.models.chess.move import Move, PROMOTION, EN_PASSANT
+from chess.models.chess.figures import FigureColor
+from chess.models.chess.movegen import get_attackers
+from chess.utils.utils import get_direction_by_color
+
+# The king can only take last, so its value outweighs any material
+SEE_VALUES = FIGURE_VALUES[:KING] + (20000,)
+
+
+def static_exchange(board: Board, move: Move) -> int:
+    """Material the side to move wins with the capture, negative when it loses"""
+    square_from, square_to = move.from_square, move.to_square
+    bitboards = board.bitboards
+    attacker = board.get_figure(square_from)
+    occupancy = board.occupancy ^ 1 << square_from
+
+    if move.flag == EN_PASSANT:
+        occupancy ^= 1 << square_to - get_direction_by_color(attacker.color) * 8
+        gain = SEE_VALUES[PAWN]
+    else:
+        victim = board.get_figure(square_to)
+        gain = SEE_VALUES[FIGURE_KINDS[type(victim)]] if victim is not None else 0
+    on_square = SEE_VALUES[FIGURE_KINDS[type(attacker)]]
+    if move.flag == PROMOTION:
+        gain += SEE_VALUES[move.promotion] - SEE_VALUES[PAWN]
+        on_square = SEE_VALUES[move.promotion]
+
+    gains = [gain]
+    side = attacker.color
+    while True:
+        side = FigureColor(1 - side.value)
+        attackers = get_attackers(board, square_to, side, occupancy) & occupancy
+        if not attackers:
+            break
+        base = side.value * KINDS_COUNT
+        for kind in range(KINDS_COUNT):
+            kind_attackers = attackers & bitboards[base + kind]
+            if kind_attackers:
+                break
+        # Balance of the side if the exchange stops after its capture
+        gains.append(on_square - gains[-1])
+        occupancy ^= 1 << lsb_square(kind_attackers)
+        on_square = SEE_VALUES[kind]
+
+    # Going backwards, every side only takes when it does better than stopping the exchange
+    for index in range(len(gains) - 1, 0, -1):
+        gains[index - 1] = -max(-gains[index - 1], gains[index])
+    return gains[0]
+
@@ -0,0 +1,213 @@
+# Transposition table
+#
+# Search results keyed by the Zobrist position key, kept in one flat buffer of 64-bit words, so the
+# buffer may be a shared memory block used by several processes at once without locks or pickling.
+#
+# Buffer layout, native byte order:
+#   header, 8 words: magic, format version, buckets count, search generation, 4 reserved
+#   buckets of two entries: the first one keeps the deepest result, the second one the latest
+#   entry, 2 words: key ^ data, data
+#   data: move (16 bits) | score + SCORE_OFFSET (16) | depth (8) | bound (2) | generation (6)
+#
+# The key is stored XORed with the data. An entry torn by writes of two processes at once doesn't
+# verify against the key, so it reads as a miss instead of returning mixed up results.
+
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+from chess.config.config import CONFIG
+from chess.models.chess.move import Move, NO_MOVE, encode_move, decode_move
+
+BOUND_NONE = 0
+BOUND_LOWER = 1
+BOUND_UPPER = 2
+BOUND_EXACT = 3
+
+TABLE_MAGIC = int.from_bytes(b'CHESSTT\0', 'little')
+TABLE_FORMAT_VERSION = 1
+HEADER_WORDS = 8
+HEADER_BYTES = HEADER_WORDS * 8
+ENTRY_WORDS = 2
+ENTRY_BYTES = ENTRY_WORDS * 8
+BUCKET_SIZE = 2
+BUCKET_WORDS = BUCKET_SIZE * ENTRY_WORDS
+SCORE_OFFSET = 1 << 15
+MAX_DEPTH = 0xFF
+GENERATIONS_COUNT = 1 << 6
+
+_MAGIC_WORD = 0
+_VERSION_WORD = 1
+_BUCKETS_WORD = 2
+_GENERATION_WORD = 3
+
+_SCORE_SHIFT = 16
+_DEPTH_SHIFT = 32
+_BOUND_SHIFT = 40
+_GENERATION_SHIFT = 42
+
+
+class TTEntry(NamedTuple):
+    depth: int
+    bound: int
+    score: int
+    move: Move | None
+
+
+def get_buckets_count(size_mb: int) -> int:
+    """Buckets fitting in the memory limit along with the header"""
+    return max(1, (size_mb * 1024 * 1024 - HEADER_BYTES) // (ENTRY_BYTES * BUCKET_SIZE))
+
+
+def get_table_bytes(buckets_count: int) -> int:
+    return HEADER_BYTES + buckets_count * BUCKET_SIZE * ENTRY_BYTES
+
+
+class TranspositionTable:
+    def __init__(self, size_mb: int | None = None, buffer: memoryview | None = None):
+        """Format the buffer, zero filled, as an empty table. The table allocates its own one by default"""
+        if size_mb is None:
+            size_mb = CONFIG.transposition_table_mb
+        if size_mb <= 0:
+            raise ValueError('Transposition table size must be positive. Got ' + str(size_mb))
+
+        buckets_count = get_buckets_count(size_mb)
+        if buffer is None:
+            buffer = memoryview(bytearray(get_table_bytes(buckets_count)))
+        elif len(buffer) < get_table_bytes(buckets_count):
+            raise ValueError(f'Transposition table needs {get_table_bytes(buckets_count)} bytes. Got {len(buffer)}')
+        self._bind(buffer, buckets_count)
+
+        words = self._words
+        words[_MAGIC_WORD] = TABLE_MAGIC
+        words[_VERSION_WORD] = TABLE_FORMAT_VERSION
+        words[_BUCKETS_WORD] = buckets_count
+        words[_GENERATION_WORD] = 0
+
+    @classmethod
+    def from_buffer(cls, buffer: memoryview) -> 'TranspositionTable':
+        """Table over a buffer another table has formatted, the entries are kept"""
+        header = buffer[:HEADER_BYTES].cast('Q')
+        magic, version, buckets_count = header[_MAGIC_WORD], header[_VERSION_WORD], header[_BUCKETS_WORD]
+        header.release()
+        if magic != TABLE_MAGIC or version != TABLE_FORMAT_VERSION:
+            raise ValueError('Buffer is not a transposition table of format ' + str(TABLE_FORMAT_VERSION))
+        if len(buffer) < get_table_bytes(buckets_count):
+            raise ValueError('Transposition table buffer is truncated')
+
+        table = cls.__new__(cls)
+        table._bind(buffer, buckets_count)
+        return table
+
+    def _bind(self, buffer: memoryview, buckets_count: int):
+        self.buckets_count = buckets_count
+        self._buffer = buffer[:get_table_bytes(buckets_count)]
+        self._words = self._buffer.cast('Q')
+
+    @property
+    def size_bytes(self) -> int:
+        return get_table_bytes(self.buckets_count)
+
+    @property
+    def generation(self) -> int:
+        """Search generation, kept in the header so every process sharing the table agrees on it"""
+        return self._words[_GENERATION_WORD]
+
+    @generation.setter
+    def generation(self, value: int):
+        self._words[_GENERATION_WORD] = value % GENERATIONS_COUNT
+
+    def clear(self):
+        self._buffer[HEADER_BYTES:] = bytes(self.size_bytes - HEADER_BYTES)
+        self.generation = 0
+
+    def close(self):
+        """Release the buffer, a shared memory block can't be closed while the table uses it"""
+        self._words.release()
+        self._buffer.release()
+
+    def new_search(self):
+        """Entries of the previous searches become the first to replace"""
+        self.generation += 1
+
+    def _bucket_index(self, key: int) -> int:
+        return HEADER_WORDS + key % self.buckets_count * BUCKET_WORDS
+
+    def probe(self, key: int) -> TTEntry | None:
+        index = self._bucket_index(key)
+        words = self._words
+        for slot in (index, index + ENTRY_WORDS):
+            data = words[slot + 1]
+            if words[slot] ^ data != key or data >> _BOUND_SHIFT & 3 == BOUND_NONE:
+                continue
+            code = data & 0xFFFF
+            return TTEntry(
+                data >> _DEPTH_SHIFT & MAX_DEPTH,
+                data >> _BOUND_SHIFT & 3,
+                (data >> _SCORE_SHIFT & 0xFFFF) - SCORE_OFFSET,
+                decode_move(code) if code != NO_MOVE else None
+            )
+        return None
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: Move | None = None):
+        index = self._bucket_index(key)
+        words = self._words
+        generation = words[_GENERATION_WORD]
+
+        # The deepest entry is replaced by a result at least as deep, of the same position or of an older search
+        old = words[index + 1]
+        old_key = words[index] ^ old
+        if old_key == key or old >> _BOUND_SHIFT & 3 == BOUND_NONE \
+                or depth >= old >> _DEPTH_SHIFT & MAX_DEPTH \
+                or old >> _GENERATION_SHIFT != generation:
+            slot = index
+            if old_key != key and old >> _BOUND_SHIFT & 3 != BOUND_NONE:
+                # The pushed out result is still worth keeping in the always replace entry
+                words[index + ENTRY_WORDS], words[index + ENTRY_WORDS + 1] = words[index], old
+        else:
+            slot = index + ENTRY_WORDS
+
+        code = encode_move(move) if move is not None else NO_MOVE
+        if code == NO_MOVE and words[slot] ^ words[slot + 1] == key:
+            # Keep the best move of a previous search of the position
+            code = words[slot + 1] & 0xFFFF
+        data = code | score + SCORE_OFFSET << _SCORE_SHIFT | min(depth, MAX_DEPTH) << _DEPTH_SHIFT \
+            | bound << _BOUND_SHIFT | generation << _GENERATION_SHIFT
+        words[slot] = key ^ data
+        words[slot + 1] = data
+
+
+class SharedTranspositionTable(TranspositionTable):
+    """Table in a named shared memory block, other processes attach to it by the name"""
+    shared_memory: SharedMemory
+
+    @classmethod
+    def create(cls, size_mb: int | None = None, name: str | None = None) -> 'SharedTranspositionTable':
+        if size_mb is None:
+            size_mb = CONFIG.transposition_table_mb
+        shared_memory = SharedMemory(name, create=True, size=get_table_bytes(get_buckets_count(size_mb)))
+        table = cls(size_mb, shared_memory.buf)
+        table.shared_memory = shared_memory
+        return table
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedTranspositionTable':
+        shared_memory = SharedMemory(name)
+        try:
+            table = cls.from_buffer(shared_memory.buf)
+        except ValueError:
+            shared_memory.close()
+            raise
+        table.shared_memory = shared_memory
+        return table
+
+    @property
+    def name(self) -> str:
+        return self.shared_memory.name
+
+    def close(self):
+        super().close()
+        self.shared_memory.close()
+
+    def unlink(self):
+        """Free the block once every process has closed it, called by its creator"""
+        self.shared_memory.unlink()
@@ -0,0 +1,40 @@
+# Zobrist hashing
+#
+# The position key is the XOR of a random key for every figure on its square, the side to move,
+# the castling rights and the en passant file, so a move only XORs in and out the keys it changes.
+# The en passant file is only mixed in when a pawn can take en passant, so the positions that only
+# differ by an en passant square nobody can use share the key.
+
+import random
+
+from chess.models.chess.bitboard import PIECES_COUNT, SQUARES_COUNT, square_x
+from chess.models.chess.constants import BOARD_SIDE_SIZE
+
+# Fixed seed, so keys are equal between runs and processes and may be stored
+ZOBRIST_SEED = 0x5EED_C4E55
+
+# Bit per castling right: color value * 2 + 1 for the rook on the right border
+CASTLING_RIGHTS_COUNT = 16
+
+_random = random.Random(ZOBRIST_SEED)
+
+PIECE_KEYS = [[_random.getrandbits(64) for _ in range(SQUARES_COUNT)] for _ in range(PIECES_COUNT)]
+# Mixed in when black is to move
+SIDE_KEY = _random.getrandbits(64)
+_CASTLING_RIGHT_KEYS = [_random.getrandbits(64) for _ in range(4)]
+EN_PASSANT_KEYS = [_random.getrandbits(64) for _ in range(BOARD_SIDE_SIZE)]
+
+
+def _castling_key(rights: int) -> int:
+    key = 0
+    for bit, right_key in enumerate(_CASTLING_RIGHT_KEYS):
+        if rights >> bit & 1:
+            key ^= right_key
+    return key
+
+
+CASTLING_KEYS = [_castling_key(rights) for rights in range(CASTLING_RIGHTS_COUNT)]
+
+
+def en_passant_key(square: int | None) -> int:
+    return 0 if square is None else EN_PASSANT_KEYS[square_x(square)]
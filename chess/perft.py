@@ -0,0 +1,156 @@
+# Perft: move generator correctness suite and benchmark
+#
+# Counts the leaf nodes of the legal move tree and compares them with the published numbers
+# of the standard test positions.
+#
+#   python -m chess.perft --depth 3
+#   python -m chess.perft --position kiwipete --depth 2 --divide
+#   python -m chess.perft --fen "8/8/8/8/8/8/8/K6k w - - 0 1" --depth 4
+
+import argparse
+import sys
+import time
+from dataclasses import dataclass
+
+from chess.models.chess.fen import START_FEN, parse_fen
+from chess.models.chess.game_state import GameState
+from chess.models.chess.move import move_name
+from chess.models.chess.movegen import generate_legal_moves
+
+
+@dataclass
+class PerftPosition:
+    name: str
+    fen: str
+    # Expected leaf nodes, the first item is depth 1
+    nodes: list[int]
+
+
+PERFT_POSITIONS = [
+    PerftPosition('start', START_FEN, [20, 400, 8902, 197281, 4865609]),
+    PerftPosition(
+        'kiwipete',
+        'r3k2r/p1ppqpb1/bn2pnp1/3PN3/1p2P3/2N2Q1p/PPPBBPPP/R3K2R w KQkq - 0 1',
+        [48, 2039, 97862, 4085603]
+    ),
+    PerftPosition('endgame', '8/2p5/3p4/KP5r/1R3p1k/8/4P1P1/8 w - - 0 1', [14, 191, 2812, 43238, 674624]),
+    PerftPosition(
+        'promotions',
+        'r3k2r/Pppp1ppp/1b3nbN/nP6/BBP1P3/q4N2/Pp1P2PP/R2Q1RK1 w kq - 0 1',
+        [6, 264, 9467, 422333]
+    ),
+    PerftPosition('talkchess', 'rnbq1k1r/pp1Pbppp/2p5/8/2B5/8/PPP1NnPP/RNBQK2R w KQ - 1 8', [44, 1486, 62379, 2103487]),
+    PerftPosition(
+        'middlegame',
+        'r4rk1/1pp1qppp/p1np1n2/2b1p1B1/2B1P1b1/P1NP1N2/1PP1QPPP/R4RK1 w - - 0 10',
+        [46, 2079, 89890, 3894594]
+    ),
+]
+
+PERFT_POSITIONS_MAP = {position.name: position for position in PERFT_POSITIONS}
+
+
+@dataclass
+class PerftResult:
+    name: str
+    depth: int
+    nodes: int
+    expected: int | None
+    seconds: float
+
+    @property
+    def passed(self) -> bool:
+        return self.expected is None or self.nodes == self.expected
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.nodes / self.seconds if self.seconds > 0 else 0.0
+
+
+def perft(game_state: GameState, depth: int) -> int:
+    if depth == 0:
+        return 1
+    moves = generate_legal_moves(game_state)
+    if depth == 1:
+        return len(moves)
+
+    nodes = 0
+    for move in moves:
+        game_state.make_move(move)
+        nodes += perft(game_state, depth - 1)
+        game_state.unmake_move()
+    return nodes
+
+
+def divide(game_state: GameState, depth: int) -> dict[str, int]:
+    """Leaf nodes under every root move, for comparing with another move generator"""
+    result = {}
+    for move in generate_legal_moves(game_state):
+        game_state.make_move(move)
+        result[move_name(move)] = perft(game_state, depth - 1)
+        game_state.unmake_move()
+    return result
+
+
+def run_perft(position: PerftPosition, depth: int, show_divide: bool = False) -> PerftResult:
+    game_state = parse_fen(position.fen)
+    started = time.perf_counter()
+    if show_divide:
+        moves = divide(game_state, depth)
+        nodes = sum(moves.values())
+    else:
+        nodes = perft(game_state, depth)
+    seconds = time.perf_counter() - started
+
+    if show_divide:
+        for name, count in sorted(moves.items()):
+            print(f'  {name}: {count}')
+
+    expected = position.nodes[depth - 1] if depth <= len(position.nodes) else None
+    return PerftResult(position.name, depth, nodes, expected, seconds)
+
+
+def format_result(result: PerftResult) -> str:
+    status = 'OK' if result.expected is not None and result.passed else '--'
+    if not result.passed:
+        status = f'FAIL (expected {result.expected})'
+    return f'{result.name:<12} depth {result.depth}  nodes {result.nodes:>10}  ' \
+           f'{result.seconds:8.2f}s  {result.nodes_per_second:>10.0f} nps  {status}'
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.perft',
+        description='Count leaf nodes of the legal move tree'
+    )
+    parser.add_argument('--depth', type=int, default=3)
+    parser.add_argument('--position', action='append', choices=list(PERFT_POSITIONS_MAP),
+                        help='built-in test position, all of them by default')
+    parser.add_argument('--fen', help='count nodes of a custom position')
+    parser.add_argument('--divide', action='store_true', help='print node counts of every root move')
+    args = parser.parse_args(argv)
+
+    if args.depth < 1:
+        parser.error('depth must be positive')
+
+    if args.fen is not None:
+        positions = [PerftPosition('fen', args.fen, [])]
+    elif args.position:
+        positions = [PERFT_POSITIONS_MAP[name] for name in args.position]
+    else:
+        positions = PERFT_POSITIONS
+
+    results = []
+    for position in positions:
+        result = run_perft(position, args.depth, args.divide)
+        print(format_result(result))
+        results.append(result)
+
+    nodes = sum(result.nodes for result in results)
+    seconds = sum(result.seconds for result in results)
+    print(f'total nodes {nodes}  {seconds:.2f}s  {nodes / seconds if seconds > 0 else 0:.0f} nps')
+    return 0 if all(result.passed for result in results) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,222 @@
+# Evaluation tuner, Texel's method
+#
+# Fits the piece-square values to the results of played games: the evaluation of a position,
+# squashed by a sigmoid, predicts the game result, and the mean squared error of the predictions
+# is minimized with gradient steps. Positions are streamed from the files in minibatches, so
+# memory doesn't grow with the corpus.
+#
+# Every line of a corpus file is a FEN followed by the game result for white: 1-0, 0-1, 1/2-1/2
+# or 1.0, 0.0, 0.5, optionally quoted or bracketed, as in the common EPD tuning sets.
+#
+#   python -m chess.tune games.epd
+#   python -m chess.tune games/*.epd --epochs 20 --batch-size 65536 --output tables.npz
+#
+# The output file is loaded by the game with --tables tables.npz.
+
+import argparse
+import math
+import sys
+from itertools import islice
+from typing import Iterable, Iterator
+
+import numpy as np
+
+from chess.models.chess.batch_evaluation import encode_bitboards
+from chess.models.chess.bitboard import KINDS_COUNT, KING, PAWN, SQUARES_COUNT, piece_index
+from chess.models.chess.constants import BOARD_SIDE_SIZE
+from chess.models.chess.fen import FenError, parse_placement_bitboards
+from chess.models.chess.figures import FigureColor
+from chess.models.chess.piece_square_tables import PIECE_SQUARE_VALUES
+
+DEFAULT_BATCH_SIZE = 16384
+DEFAULT_EPOCHS = 10
+DEFAULT_LEARNING_RATE = 1.0
+# Scaling of the sigmoid, the one fitting the current values best is searched among these
+SCALING_CANDIDATES = np.linspace(0.2, 2.0, 37)
+
+RESULTS = {
+    '1-0': 1.0,
+    '0-1': 0.0,
+    '1/2-1/2': 0.5,
+}
+
+
+class CorpusError(ValueError):
+    pass
+
+
+def parse_result(token: str) -> float:
+    token = token.strip('"[]();')
+    if token in RESULTS:
+        return RESULTS[token]
+    try:
+        result = float(token)
+    except ValueError:
+        raise CorpusError(f'Wrong game result "{token}"') from None
+    if result not in (0.0, 0.5, 1.0):
+        raise CorpusError(f'Wrong game result "{token}"')
+    return result
+
+
+def read_positions(paths: Iterable[str]) -> Iterator[tuple[list[int], float]]:
+    """Bitboards and result of every position of the files, lines without a position are skipped"""
+    for path in paths:
+        with open(path) as file:
+            for line_number, line in enumerate(file, 1):
+                fields = line.split()
+                if len(fields) < 2:
+                    continue
+                try:
+                    yield parse_placement_bitboards(fields[0]), parse_result(fields[-1])
+                except FenError as error:
+                    raise CorpusError(f'{path}:{line_number}: {error}') from None
+
+
+def get_features(planes: np.ndarray) -> np.ndarray:
+    """Figures of white minus figures of black on the squares seen by white, shape (N, 6 * 64)"""
+    count = len(planes)
+    white = planes[:, piece_index(PAWN, FigureColor.WHITE):piece_index(KING, FigureColor.WHITE) + 1]
+    black = planes[:, piece_index(PAWN, FigureColor.BLACK):piece_index(KING, FigureColor.BLACK) + 1]
+    # Black figures are mirrored between the top and the bottom rows, like their tables
+    black = black.reshape(count, KINDS_COUNT, BOARD_SIDE_SIZE, BOARD_SIDE_SIZE)[:, :, ::-1]
+    features = white.astype(np.float32) - black.reshape(count, KINDS_COUNT, SQUARES_COUNT)
+    return features.reshape(count, KINDS_COUNT * SQUARES_COUNT)
+
+
+def iter_batches(paths: Iterable[str], batch_size: int) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """Features and results of the positions of the files, batch_size positions at once"""
+    positions = read_positions(paths)
+    while batch := list(islice(positions, batch_size)):
+        bitboards = np.array([position[0] for position in batch], dtype=np.uint64)
+        results = np.array([position[1] for position in batch], dtype=np.float32)
+        yield get_features(encode_bitboards(bitboards)), results
+
+
+def get_initial_weights() -> np.ndarray:
+    """Current values of the white figures, shape (6 * 64)"""
+    first = piece_index(PAWN, FigureColor.WHITE)
+    return np.array(PIECE_SQUARE_VALUES[first:first + KINDS_COUNT], dtype=np.float64).reshape(-1)
+
+
+def predict(features: np.ndarray, weights: np.ndarray, scaling: float) -> np.ndarray:
+    """Expected result for white of every position"""
+    return 1 / (1 + np.power(10, -scaling * (features @ weights) / 400))
+
+
+def get_error(features: np.ndarray, results: np.ndarray, weights: np.ndarray, scaling: float) -> float:
+    return float(np.mean((results - predict(features, weights, scaling)) ** 2))
+
+
+def fit_scaling(features: np.ndarray, results: np.ndarray, weights: np.ndarray) -> float:
+    errors = [get_error(features, results, weights, scaling) for scaling in SCALING_CANDIDATES]
+    return float(SCALING_CANDIDATES[int(np.argmin(errors))])
+
+
+def get_gradient(features: np.ndarray, results: np.ndarray, weights: np.ndarray, scaling: float) -> np.ndarray:
+    """Gradient of the mean squared error by the weights"""
+    predictions = predict(features, weights, scaling)
+    slope = predictions * (1 - predictions) * scaling * math.log(10) / 400
+    return features.T @ (-2 * (results - predictions) * slope) / len(features)
+
+
+class AdamOptimizer:
+    """Gradient steps with per weight rates, the centipawn weights and the tiny gradients need them"""
+
+    def __init__(self, size: int, learning_rate: float, beta1: float = 0.9, beta2: float = 0.999):
+        self.learning_rate = learning_rate
+        self.beta1, self.beta2 = beta1, beta2
+        self.moment = np.zeros(size)
+        self.velocity = np.zeros(size)
+        self.steps = 0
+
+    def step(self, weights: np.ndarray, gradient: np.ndarray):
+        self.steps += 1
+        self.moment = self.beta1 * self.moment + (1 - self.beta1) * gradient
+        self.velocity = self.beta2 * self.velocity + (1 - self.beta2) * gradient ** 2
+        moment = self.moment / (1 - self.beta1 ** self.steps)
+        velocity = self.velocity / (1 - self.beta2 ** self.steps)
+        weights -= self.learning_rate * moment / (np.sqrt(velocity) + 1e-8)
+
+
+def tune(paths: list[str], epochs: int = DEFAULT_EPOCHS, batch_size: int = DEFAULT_BATCH_SIZE,
+         learning_rate: float = DEFAULT_LEARNING_RATE, scaling: float | None = None,
+         on_epoch=None) -> tuple[np.ndarray, float]:
+    """Tuned values of the white figures, shape (6, 64), and the sigmoid scaling"""
+    weights = get_initial_weights()
+    optimizer = AdamOptimizer(len(weights), learning_rate)
+    for epoch in range(epochs):
+        error, count = 0.0, 0
+        for features, results in iter_batches(paths, batch_size):
+            if scaling is None:
+                scaling = fit_scaling(features, results, weights)
+            error += get_error(features, results, weights, scaling) * len(features)
+            count += len(features)
+            optimizer.step(weights, get_gradient(features, results, weights, scaling))
+        if count == 0:
+            raise CorpusError('Corpus has no positions')
+        if on_epoch is not None:
+            on_epoch(epoch, error / count)
+    return weights.reshape(KINDS_COUNT, SQUARES_COUNT), scaling
+
+
+def split_values(values: np.ndarray) -> tuple[list[int], np.ndarray]:
+    """Figure values and placement tables of the tuned values, the table of a figure averages zero"""
+    values = np.rint(values).astype(int)
+    figure_values = []
+    for kind in range(KINDS_COUNT):
+        squares = values[kind]
+        if kind == PAWN:
+            # Pawns never stand on the first and the last rows
+            squares = squares[BOARD_SIDE_SIZE:-BOARD_SIDE_SIZE]
+        figure_values.append(0 if kind == KING else int(np.rint(squares.mean())))
+    tables = values - np.array(figure_values)[:, None]
+    tables[PAWN, :BOARD_SIDE_SIZE] = tables[PAWN, -BOARD_SIDE_SIZE:] = 0
+    return figure_values, tables
+
+
+def format_values(figure_values: list[int], tables: np.ndarray) -> str:
+    """Values in the layout of piece_square_tables.py"""
+    lines = [f'FIGURE_VALUES = {tuple(figure_values)}']
+    for name, table in zip(('PAWN', 'KNIGHT', 'BISHOP', 'ROOK', 'QUIN', 'KING'), tables):
+        lines.append(f'\n_{name}_TABLE = (')
+        for row in table.reshape(BOARD_SIDE_SIZE, BOARD_SIDE_SIZE):
+            lines.append('    ' + ', '.join(str(value) for value in row) + ',')
+        lines.append(')')
+    return '\n'.join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog='python -m chess.tune',
+        description='Fit the piece-square values to the results of the games'
+    )
+    parser.add_argument('files', nargs='+', help='corpus files, a FEN and the game result per line')
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument('--learning-rate', type=float, default=DEFAULT_LEARNING_RATE)
+    parser.add_argument('--scaling', type=float, help='sigmoid scaling, fitted on the first batch by default')
+    parser.add_argument('--output', help='save the tuned values to this .npz file, the game loads it with --tables')
+    args = parser.parse_args(argv)
+
+    if args.epochs < 1 or args.batch_size < 1:
+        parser.error('epochs and batch size must be positive')
+
+    def report(epoch: int, error: float):
+        print(f'epoch {epoch + 1:>4}  error {error:.6f}')
+
+    try:
+        values, scaling = tune(args.files, args.epochs, args.batch_size, args.learning_rate, args.scaling, report)
+    except (OSError, CorpusError) as error:
+        print(error, file=sys.stderr)
+        return 1
+
+    figure_values, tables = split_values(values)
+    print(f'# scaling {scaling:.3f}')
+    print(format_values(figure_values, tables))
+    if args.output:
+        np.savez(args.output, figure_values=np.array(figure_values), tables=tables, scaling=scaling)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,59 @@
+# Shared test helpers
+#
+# A random walk plays random legal moves from a position, so the incrementally updated state can be
+# compared with the state computed from scratch along the way and again while the moves are undone.
+
+import operator
+import random
+from typing import Any, Callable, Iterator
+
+from chess.models.chess.fen import parse_fen
+from chess.models.chess.game_state import GameState
+from chess.models.chess.move import MoveList
+from chess.models.chess.movegen import generate_legal_moves
+from chess.perft import PERFT_POSITIONS
+
+
+def random_walk(game_state: GameState, plies: int, rnd: random.Random) -> Iterator[MoveList]:
+    """Plays up to plies random legal moves, yields the legal moves of every position reached, the start included"""
+    for ply in range(plies + 1):
+        moves = generate_legal_moves(game_state)
+        yield moves
+        if not moves or ply == plies:
+            return
+        game_state.make_move(rnd.choice(moves))
+
+
+def unwind(game_state: GameState) -> Iterator[int]:
+    """Unmakes every move, yields the number of moves still played after each one"""
+    while game_state.undo_stack:
+        game_state.unmake_move()
+        yield len(game_state.undo_stack)
+
+
+def perft_walks(plies: int, seed: int) -> Iterator[GameState]:
+    """Random walk from every perft position, yields the game state at every position reached"""
+    rnd = random.Random(seed)
+    for position in PERFT_POSITIONS:
+        game_state = parse_fen(position.fen)
+        for _ in random_walk(game_state, plies, rnd):
+            yield game_state
+
+
+def check_incremental(value: Callable[[GameState], Any], full_value: Callable[[GameState], Any], plies: int,
+                      seed: int, prepare: Callable[[GameState], None] | None = None,
+                      equal: Callable[[Any, Any], bool] = operator.eq, close: Callable[[Any, Any], bool] | None = None):
+    """Walks randomly from every perft position: the incremental value must be close to the full one at every
+    position, and undoing the moves must bring back the equal values"""
+    rnd = random.Random(seed)
+    close = close if close is not None else equal
+    for position in PERFT_POSITIONS:
+        game_state = parse_fen(position.fen)
+        if prepare is not None:
+            prepare(game_state)
+        values = []
+        for _ in random_walk(game_state, plies, rnd):
+            values.append(value(game_state))
+            assert close(values[-1], full_value(game_state))
+        for ply in unwind(game_state):
+            assert equal(value(game_state), values[ply])
@@ -0,0 +1,21 @@
+from chess.models.chess.batch_evaluation import encode_positions, evaluate_batch
+from chess.models.chess.evaluation import evaluate
+from chess.models.chess.fen import START_FEN, parse_fen
+from tests.helpers import perft_walks
+
+
+class TestBatchEvaluation:
+
+    def test_encoding(self):
+        planes = encode_positions([parse_fen(START_FEN)])
+        assert planes.shape == (1, 12, 64)
+        assert planes.sum() == 32
+        # White pawns fill the seventh row from the top
+        assert list(planes[0, 6].nonzero()[0]) == list(range(48, 56))
+
+    def test_batch_matches_evaluate(self):
+        game_states = [game_state.copy() for game_state in perft_walks(20, seed=3)]
+
+        scores = evaluate_batch(iter(game_states))
+        assert scores.tolist() == [evaluate(game_state) for game_state in game_states]
+        assert evaluate_batch([]).shape == (0,)
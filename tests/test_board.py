@@ -0,0 +1,105 @@
+import pickle
+
+import pytest
+
+from chess.lib.vec import vec
+from chess.models.chess.bitboard import square_index, square_position, popcount
+from chess.models.chess.board import Board
+from chess.models.chess.figures import FigureColor, Pawn, King, Quin
+from chess.models.chess.mailbox import EMPTY, MAILBOX_SIZE, Mailbox
+
+
+class TestBoardBitboards:
+
+    def test_build(self, board):
+        assert popcount(board.occupancy) == 32
+        assert popcount(board.get_color_bitboard(FigureColor.WHITE)) == 16
+        assert board.get_figures_bitboard(Pawn, FigureColor.BLACK) == 0xFF << 8
+        assert board.get_king_square(FigureColor.WHITE) == square_index(3, 7)
+
+    def test_move_figure(self, board):
+        board.move_figure((3, 6), (3, 1))
+        pawns = board.get_figures_bitboard(Pawn, FigureColor.WHITE)
+        assert pawns >> square_index(3, 1) & 1
+        assert not pawns >> square_index(3, 6) & 1
+        assert not board.get_figures_bitboard(Pawn, FigureColor.BLACK) >> square_index(3, 1) & 1
+        assert popcount(board.occupancy) == 31
+
+    def test_set_cell_content(self, board):
+        board.set_cell_content(0, 4, Quin(FigureColor.BLACK))
+        board.get_cell((0, 1)).clear()
+        assert board.get_figures_bitboard(Quin, FigureColor.BLACK) >> square_index(0, 4) & 1
+        assert not board.occupancy >> square_index(0, 1) & 1
+
+    def test_cell_position(self, board):
+        cell = board.get_cell((5, 2))
+        assert cell.square == square_index(5, 2)
+        assert board.get_cell_position(cell) == vec(5, 2)
+        assert board.get_cell_position(Board.build().get_cell((5, 2))) is None
+
+    def test_reset(self, board):
+        board.reset()
+        assert board.occupancy == 0
+        board.set_cell_content(2, 2, King(FigureColor.BLACK))
+        assert board.get_king_square(FigureColor.BLACK) == square_index(2, 2)
+
+
+class TestMailbox:
+
+    def test_board_view(self, board):
+        view = Board(board.mailbox.copy())
+        assert view.bitboards == board.bitboards
+        assert view.key == board.key
+        assert type(view.get_figure(square_index(3, 7))) == King
+
+    def test_copy(self, board):
+        copy = board.copy()
+        copy.move_figure((3, 6), (3, 4))
+        assert board.get_figure(square_index(3, 4)) is None
+        assert type(board.get_figure(square_index(3, 6))) == Pawn
+        assert copy.mailbox != board.mailbox
+        assert board.board is board.board and copy.board[0][0].board is copy
+        assert Board(copy.mailbox.copy()).key == copy.key
+
+    def test_pickle(self, board):
+        mailbox = pickle.loads(pickle.dumps(board.mailbox))
+        assert len(mailbox.cells) == MAILBOX_SIZE
+        assert mailbox == board.mailbox
+        assert pickle.loads(pickle.dumps(board)).key == board.key
+        size = len(pickle.dumps(board))
+        assert board.board[0][0].board is board
+        assert len(pickle.dumps(board)) == size
+        assert pickle.loads(pickle.dumps(board)).board[0][0].content == board.board[0][0].content
+
+    def test_empty_cells(self, board):
+        assert board.mailbox.cells.count(EMPTY) == MAILBOX_SIZE - 32
+        board.reset()
+        assert Mailbox().get_piece(square_index(0, 7)) is None
+        assert board.mailbox == Mailbox()
+
+
+class TestFlyweights:
+
+    def test_shared_figures(self, board):
+        assert Pawn(FigureColor.WHITE) is board.get_figure(square_index(0, 6))
+        assert Pawn(FigureColor.WHITE) is not Pawn(FigureColor.BLACK)
+        assert pickle.loads(pickle.dumps(King(FigureColor.BLACK))) is King(FigureColor.BLACK)
+        with pytest.raises(AttributeError):
+            Quin(FigureColor.WHITE).color = FigureColor.BLACK
+
+    def test_square_positions(self):
+        position = square_position(square_index(2, 5))
+        assert position is square_position(square_index(2, 5))
+        assert position == vec(2, 5) and vec(2, 5) == position
+        assert len({position, square_position(square_index(2, 5)), square_position(0)}) == 2
+        assert vec(position) + (1, 1) == vec(3, 6)
+
+        moved = position
+        moved += vec(1, 0)
+        assert moved == vec(3, 5) and position == vec(2, 5)
+        assert pickle.loads(pickle.dumps(position)) is position
+
+
+@pytest.fixture(scope='function')
+def board():
+    return Board.build()
@@ -35,6 +35,14 @@ class TestChessEngine:
         CELLS = [vec(3, 2), vec(3, 3)]
         assert cells == CELLS
 
+    def test_off_board_positions(self, classic_game_res):
+        engine = classic_game_res
+        key = engine.game_state.position_key()
+        assert not engine.do_peace(vec(1, -1), vec(0, 5))
+        assert not engine.do_peace(vec(1, 6), vec(8, 4))
+        assert engine.get_available_cells(vec(-1, 7)) == []
+        assert engine.game_state.position_key() == key
+
     def test_will_pawn_transform(self):
         pass
 
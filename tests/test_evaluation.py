@@ -0,0 +1,23 @@
+from chess.models.chess.evaluation import evaluate, pawn_advantage
+from chess.models.chess.fen import START_FEN, parse_fen
+from chess.models.chess.piece_square_tables import get_placement_score
+from tests.helpers import check_incremental
+
+
+class TestEvaluation:
+
+    def test_incremental_score_matches_full_score(self):
+        check_incremental(lambda game_state: game_state.score,
+                          lambda game_state: get_placement_score(game_state.board.bitboards), 40, seed=2)
+
+    def test_symmetric_position(self):
+        game_state = parse_fen(START_FEN)
+        assert game_state.score == 0
+        assert pawn_advantage(game_state) == 0
+
+    def test_side_to_move(self):
+        # White is a knight up
+        game_state = parse_fen('4k3/8/8/8/8/8/8/1N2K3 w - - 0 1')
+        assert pawn_advantage(game_state) > 2
+        black_to_move = parse_fen('4k3/8/8/8/8/8/8/1N2K3 b - - 0 1')
+        assert evaluate(black_to_move) == -evaluate(game_state) < 0
@@ -0,0 +1,179 @@
+import pickle
+import random
+
+import pytest
+
+from chess.lib.vec import vec
+from chess.models.chess.bitboard import KNIGHT, QUIN, KING, name_square, square_index
+from chess.models.chess.chess_engine import ChessEngine
+from chess.models.chess.figures import FigureColor, Pawn
+from chess.models.chess.fen import START_FEN, parse_fen, to_fen
+from chess.models.chess.games import ClassicGame, DebugGame
+from chess.models.chess.move import Move, MoveList, PROMOTION, EN_PASSANT, CASTLING
+from chess.models.chess.movegen import generate_legal_moves, get_legal_move, is_legal_move
+from chess.perft import PERFT_POSITIONS, PERFT_POSITIONS_MAP
+from tests.helpers import random_walk
+
+
+class TestLegalMoves:
+
+    def test_start_position(self, classic_game_res):
+        assert len(classic_game_res.generate_legal_moves()) == 20
+
+    def test_pinned_figure(self):
+        engine = ChessEngine(DebugGame("""
+k  r
+
+
+   R
+
+   K
+"""))
+        cells = engine.get_available_cells(vec(3, 3))
+        assert cells == [vec(3, 0), vec(3, 1), vec(3, 2), vec(3, 4)]
+
+    def test_check_evasions(self):
+        engine = ChessEngine(DebugGame("""
+k  r
+
+
+H
+
+  R
+
+   K
+"""))
+        # The knight can't reach the file, the rook can only block it
+        assert engine.get_available_cells(vec(0, 3)) == []
+        assert engine.get_available_cells(vec(2, 5)) == [vec(3, 5)]
+        assert engine.get_available_cells(vec(3, 7)) == [vec(2, 6), vec(4, 6), vec(2, 7), vec(4, 7)]
+
+    def test_en_passant(self, classic_game_res):
+        engine = classic_game_res
+        engine.do_peace(vec(4, 6), vec(4, 4))
+        engine.do_peace(vec(0, 1), vec(0, 2))
+        engine.do_peace(vec(4, 4), vec(4, 3))
+        engine.do_peace(vec(3, 1), vec(3, 3))
+
+        moves = [move for move in engine.generate_legal_moves() if move.flag == EN_PASSANT]
+        assert len(moves) == 1
+        engine.do_peace(vec(4, 3), vec(3, 2))
+        assert type(engine.board.get_figure(square_index(3, 2))) == Pawn
+        assert engine.board.get_figure(square_index(3, 3)) is None
+
+    def test_castling_through_attacked_cell(self):
+        engine = ChessEngine(DebugGame("""
+k    r
+
+
+
+
+
+
+R  K   R
+"""))
+        castling = [move.to_square for move in engine.generate_legal_moves() if move.flag == CASTLING]
+        assert castling == [square_index(1, 7)]
+
+    def test_checkmate(self, classic_game_res):
+        engine = classic_game_res
+        engine.do_peace(vec(2, 6), vec(2, 5))
+        engine.do_peace(vec(3, 1), vec(3, 3))
+        engine.do_peace(vec(1, 6), vec(1, 4))
+        engine.do_peace(vec(4, 0), vec(0, 4))
+        assert engine.is_checkmate()
+        assert not engine.is_stalemate()
+
+
+class TestMakeMove:
+
+    @pytest.mark.parametrize('name', ['kiwipete', 'talkchess'])
+    def test_unmake_restores_position(self, name):
+        game_state = parse_fen(PERFT_POSITIONS_MAP[name].fen)
+        board = game_state.board
+        figures = [board.get_figure(square) for square in range(64)]
+        bitboards = list(board.bitboards)
+        castling_rights = game_state.castling_rights
+
+        moves = generate_legal_moves(game_state)
+        for move in moves:
+            game_state.make_move(move)
+            game_state.unmake_move()
+
+            assert [board.get_figure(square) for square in range(64)] == figures
+            assert board.bitboards == bitboards
+            assert game_state.castling_rights == castling_rights
+            assert game_state.current_step_player == FigureColor.WHITE
+            assert game_state.undo_stack == []
+
+    def test_castling_rights_restored(self):
+        game_state = parse_fen(PERFT_POSITIONS_MAP['kiwipete'].fen)
+        castling = [move for move in generate_legal_moves(game_state) if move.flag == CASTLING]
+        game_state.make_move(castling[0])
+        game_state.unmake_move()
+        assert [move for move in generate_legal_moves(game_state) if move.flag == CASTLING] == castling
+
+    def test_castling_rights_lost(self):
+        game_state = parse_fen('r3k2r/8/8/8/8/8/8/R3K2R w KQkq - 0 1')
+        # The rook leaves its corner, then captures the black rook in the opposite one
+        game_state.make_move(Move(square_index(7, 7), square_index(7, 3)))
+        assert to_fen(game_state).split()[2] == 'Qkq'
+        game_state.make_move(Move(square_index(4, 0), square_index(3, 0)))
+        assert to_fen(game_state).split()[2] == 'Q'
+        game_state.make_move(Move(square_index(0, 7), square_index(0, 0)))
+        assert to_fen(game_state).split()[2] == '-'
+        assert game_state.position_key() == parse_fen(to_fen(game_state)).position_key()
+
+
+class TestSingleMove:
+
+    def test_matches_generator(self):
+        rnd = random.Random(3)
+        for position in PERFT_POSITIONS:
+            game_state = parse_fen(position.fen)
+            for moves in random_walk(game_state, 6, rnd):
+                expected = {(move.from_square, move.to_square): move for move in moves
+                            if move.promotion in (None, QUIN)}
+                for square_from in range(64):
+                    for square_to in range(64):
+                        figure = game_state.board.get_figure(square_from)
+                        if figure is None or figure.color != game_state.current_step_player:
+                            continue
+                        assert get_legal_move(game_state, square_from, square_to) \
+                               == expected.get((square_from, square_to))
+
+    def test_promotion_choice(self):
+        game_state = parse_fen(PERFT_POSITIONS_MAP['talkchess'].fen)
+        d7, c8 = name_square('d7'), name_square('c8')
+        assert get_legal_move(game_state, d7, c8, KNIGHT) == Move(d7, c8, PROMOTION, KNIGHT)
+        assert get_legal_move(game_state, d7, c8, KING) is None
+        assert not is_legal_move(game_state, d7, name_square('d8'))
+
+    def test_off_board_squares(self):
+        game_state = parse_fen(START_FEN)
+        for square_from, square_to in [(-7, 40), (-1, 40), (64, 40), (name_square('b1'), -24), (name_square('b1'), 80)]:
+            assert get_legal_move(game_state, square_from, square_to) is None
+        assert to_fen(game_state) == START_FEN
+
+
+class TestMoveList:
+
+    def test_packed_moves(self):
+        moves = generate_legal_moves(parse_fen(PERFT_POSITIONS_MAP['talkchess'].fen))
+        assert moves.itemsize == 2
+        assert all(type(move) is Move for move in moves)
+        promotion = next(move for move in moves if move.flag == PROMOTION)
+        assert Move(promotion.from_square, promotion.to_square, PROMOTION, promotion.promotion) == promotion
+        assert moves[moves.index(promotion)] == promotion and promotion in moves
+        assert pickle.loads(pickle.dumps(list(moves))) == list(moves)
+
+    def test_integer_compare(self):
+        move = Move(square_index(4, 6), square_index(4, 4))
+        assert move == int(move) and move != Move(square_index(4, 6), square_index(4, 5))
+        assert len({move, Move(square_index(4, 6), square_index(4, 4))}) == 1
+        assert MoveList([move])[0].to_square == square_index(4, 4)
+
+
+@pytest.fixture(scope='function')
+def classic_game_res():
+    return ChessEngine(ClassicGame())
@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+from chess.models.chess.evaluation import evaluate
+from chess.models.chess.fen import START_FEN, parse_fen
+from chess.models.chess.movegen import generate_legal_moves
+from chess.models.chess.nnue import Accumulator, NeuralNetwork, enable_neural_evaluation
+from chess.models.chess.search import Search, SearchLimits
+from chess.models.chess.transposition_table import TranspositionTable
+from chess.perft import PERFT_POSITIONS_MAP
+from tests.helpers import check_incremental
+
+
+class TestNeuralEvaluation:
+
+    def test_incremental_accumulator_matches_refresh(self):
+        network = NeuralNetwork.random(seed=1)
+        check_incremental(
+            lambda game_state: game_state.accumulator.values,
+            lambda game_state: Accumulator(network, game_state).values, 30, seed=4,
+            prepare=lambda game_state: enable_neural_evaluation(game_state, network),
+            equal=np.array_equal, close=lambda values, full: np.allclose(values, full, atol=1e-4)
+        )
+
+    def test_views_are_symmetric(self):
+        # Colors swapped and the board mirrored, the side to move gets the same score
+        network = NeuralNetwork.random(seed=2)
+        white = parse_fen('4k3/8/8/8/8/8/4P3/1N2K3 w - - 0 1')
+        black = parse_fen('1n2k3/4p3/8/8/8/8/8/4K3 b - - 0 1')
+        enable_neural_evaluation(white, network)
+        enable_neural_evaluation(black, network)
+        assert evaluate(white) == evaluate(black)
+
+    def test_load_and_search(self, tmp_path):
+        path = tmp_path / 'network.npz'
+        NeuralNetwork.random(seed=3).save(path)
+        network = NeuralNetwork.load(path)
+
+        game_state = parse_fen(PERFT_POSITIONS_MAP['kiwipete'].fen)
+        enable_neural_evaluation(game_state, network)
+        values = game_state.accumulator.values
+        result = Search(game_state, TranspositionTable(1)).run(SearchLimits(depth=1))
+        assert result.move is not None
+        assert np.array_equal(game_state.accumulator.values, values)
+
+        np.savez(tmp_path / 'broken.npz', feature_weights=network.feature_weights)
+        with pytest.raises(ValueError):
+            NeuralNetwork.load(tmp_path / 'broken.npz')
+
+    def test_enabled_after_moves(self):
+        game_state = parse_fen(START_FEN)
+        game_state.make_move(generate_legal_moves(game_state)[0])
+        enable_neural_evaluation(game_state, NeuralNetwork.random(seed=4))
+        game_state.unmake_move()
+        full = Accumulator(game_state.accumulator.network, game_state)
+        assert np.allclose(game_state.accumulator.values, full.values)
@@ -0,0 +1,39 @@
+from chess.models.chess.fen import parse_fen, to_fen
+from chess.models.chess.games import ClassicGame
+from chess.models.chess.move import move_name
+from chess.models.chess.parallel_search import ParallelSearch
+from chess.models.chess.search import SearchLimits, MATE_SCORE
+from chess.perft import PERFT_POSITIONS
+
+
+class TestParallelSearch:
+
+    def test_fen_round_trip(self):
+        for position in PERFT_POSITIONS:
+            game_state = parse_fen(position.fen)
+            assert parse_fen(to_fen(game_state)).position_key() == game_state.position_key()
+        game_state = ClassicGame().game_state
+        assert parse_fen(to_fen(game_state)).position_key() == game_state.position_key()
+
+    def test_workers_share_table(self):
+        game_state = parse_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+        with ParallelSearch(game_state, workers=2, size_mb=1) as search:
+            result = search.run(SearchLimits(depth=3))
+            assert move_name(result.move) == 'a1a8'
+            assert result.score == MATE_SCORE - 1
+            # The root result of the workers is visible to the main process
+            assert search.transposition_table.probe(game_state.position_key()) is not None
+
+            # Workers stay alive between searches
+            game_state.make_move(result.move)
+            assert search.run(SearchLimits(depth=2)).move is None
+
+    def test_dead_workers(self):
+        game_state = parse_fen('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1')
+        with ParallelSearch(game_state, workers=2, size_mb=1) as search:
+            search._processes[0].kill()
+            assert move_name(search.run(SearchLimits(depth=3)).move) == 'a1a8'
+            # With no worker left the game process searches
+            search._processes[1].kill()
+            result = search.run(SearchLimits(depth=3))
+            assert move_name(result.move) == 'a1a8' and result.nodes > 0
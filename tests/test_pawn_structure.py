@@ -0,0 +1,37 @@
+from chess.models.chess.fen import parse_fen
+from chess.models.chess.pawn_structure import PawnHashTable, evaluate_pawn_structure, DOUBLED_PAWN_PENALTY, \
+    ISOLATED_PAWN_PENALTY, PASSED_PAWN_BONUS
+from chess.models.chess.search import Search, SearchLimits
+from chess.models.chess.transposition_table import TranspositionTable
+from chess.perft import PERFT_POSITIONS_MAP
+from tests.helpers import check_incremental
+
+
+class TestPawnStructure:
+
+    def test_incremental_pawn_key(self):
+        check_incremental(lambda game_state: game_state.board.pawn_key,
+                          lambda game_state: game_state.board.copy().pawn_key, 40, seed=7)
+
+    def test_pawn_key_ignores_figures(self):
+        first = parse_fen('4k3/pp6/8/8/8/8/PP6/4K1N1 w - - 0 1').board
+        second = parse_fen('3k4/pp6/8/8/8/8/PP6/2B1K3 w - - 0 1').board
+        assert first.pawn_key == second.pawn_key
+        assert first.key != second.key
+
+    def test_terms(self):
+        # White: doubled isolated passed pawns on the a file. Black: an isolated passed pawn on its sixth rank
+        board = parse_fen('4k3/8/8/8/8/P6p/P7/4K3 w - - 0 1').board
+        white = -DOUBLED_PAWN_PENALTY - 2 * ISOLATED_PAWN_PENALTY + PASSED_PAWN_BONUS[1] + PASSED_PAWN_BONUS[2]
+        black = -ISOLATED_PAWN_PENALTY + PASSED_PAWN_BONUS[5]
+        assert evaluate_pawn_structure(board) == white - black
+
+    def test_cache_hit_rate(self):
+        search = Search(parse_fen(PERFT_POSITIONS_MAP['middlegame'].fen), TranspositionTable(1))
+        search.run(SearchLimits(depth=4))
+        assert search.pawn_table.hit_rate > 0.9
+
+        table = PawnHashTable(4)
+        board = parse_fen(PERFT_POSITIONS_MAP['endgame'].fen).board
+        assert table.get_score(board) == table.get_score(board) == evaluate_pawn_structure(board)
+        assert (table.probes, table.hits) == (2, 1)
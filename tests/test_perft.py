@@ -0,0 +1,23 @@
+import pytest
+
+from chess.models.chess.games import ClassicGame
+from chess.perft import PERFT_POSITIONS, perft, run_perft, divide
+
+
+class TestPerft:
+
+    @pytest.mark.parametrize('position', PERFT_POSITIONS, ids=lambda position: position.name)
+    def test_positions(self, position):
+        result = run_perft(position, 2)
+        assert result.nodes == position.nodes[1]
+
+    def test_classic_game(self):
+        # Kings and quins are swapped compared to the standard setup, the tree is its mirror image
+        game_state = ClassicGame().game_state
+        assert perft(game_state, 3) == 8902
+
+    def test_divide(self):
+        game_state = ClassicGame().game_state
+        moves = divide(game_state, 2)
+        assert len(moves) == 20
+        assert sum(moves.values()) == 400
@@ -0,0 +1,130 @@
+import pytest
+
+from chess.controllers.chess_controller import ChessController
+from chess.models.chess.bitboard import name_square
+from chess.models.chess.fen import parse_fen
+from chess.models.chess.figures import FigureColor
+from chess.models.chess.move import Move, move_name
+from chess.models.chess.move_ordering import MoveOrdering
+from chess.models.chess.movegen import generate_legal_moves
+from chess.models.chess.see import static_exchange
+from chess.bench import main as bench_main
+from chess.models.chess.search import Search, SearchLimits, SearchOptions, MATE_SCORE
+from chess.models.chess.transposition_table import TranspositionTable
+from chess.perft import PERFT_POSITIONS_MAP
+
+
+def run_search(fen: str, limits: SearchLimits, options: SearchOptions | None = None):
+    return Search(parse_fen(fen), TranspositionTable(1), options).run(limits)
+
+
+class TestSearch:
+
+    def test_mate_in_one(self):
+        result = run_search('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1', SearchLimits(depth=3))
+        assert move_name(result.move) == 'a1a8'
+        assert result.score == MATE_SCORE - 1
+        assert result.pv[0] == result.move
+
+    def test_wins_material(self):
+        result = run_search('4k3/8/8/3q4/8/8/3R4/4K3 w - - 0 1', SearchLimits(depth=2))
+        assert move_name(result.move) == 'd2d5'
+
+    def test_quiescence_sees_recapture(self):
+        result = run_search('4k3/8/2p5/3p4/8/8/3Q4/4K3 w - - 0 1', SearchLimits(depth=1))
+        assert move_name(result.move) != 'd2d5'
+        # Queen against two passed pawns, nothing lost to the recapture
+        assert result.score >= 600
+
+    def test_checkmated_side(self):
+        result = run_search('R5k1/5ppp/8/8/8/8/8/6K1 b - - 0 1', SearchLimits(depth=2))
+        assert result.move is None
+        assert result.score == -MATE_SCORE
+
+    def test_node_budget(self):
+        fen = PERFT_POSITIONS_MAP['kiwipete'].fen
+        result = run_search(fen, SearchLimits(nodes=3000))
+        assert result.move is not None
+        assert result.depth >= 1
+        assert result.nodes < 6000
+
+    def test_time_budget_keeps_position(self):
+        game_state = parse_fen(PERFT_POSITIONS_MAP['middlegame'].fen)
+        key = game_state.position_key()
+        result = Search(game_state, TranspositionTable(1)).run(SearchLimits(time=0.2))
+        assert result.move is not None
+        assert result.seconds < 2
+        assert game_state.position_key() == key
+        assert game_state.undo_stack == []
+
+
+class TestSelectiveSearch:
+
+    def test_null_move(self):
+        game_state = parse_fen(PERFT_POSITIONS_MAP['kiwipete'].fen)
+        key = game_state.position_key()
+        game_state.make_null_move()
+        assert game_state.current_step_player == FigureColor.BLACK
+        assert game_state.position_key() != key
+        game_state.unmake_null_move()
+        assert game_state.position_key() == key
+        assert game_state.undo_stack == []
+
+    @pytest.mark.parametrize('technique', ['null_move_pruning', 'late_move_reductions', 'futility_pruning'])
+    def test_pruning_saves_nodes(self, technique):
+        # Every technique cuts nodes here outside the principal variation
+        fen = PERFT_POSITIONS_MAP['middlegame'].fen
+        full = run_search(fen, SearchLimits(depth=4), SearchOptions(check_extensions=False))
+        plain = SearchOptions(**{technique: False, 'check_extensions': False})
+        assert run_search(fen, SearchLimits(depth=4), plain).nodes > full.nodes
+
+    def test_mate_found_with_every_technique(self):
+        plain = SearchOptions(False, False, False, False)
+        for options in (SearchOptions(), plain):
+            result = run_search('6k1/5ppp/8/8/8/8/8/R5K1 w - - 0 1', SearchLimits(depth=4), options)
+            assert result.score == MATE_SCORE - 1
+
+    def test_bench(self, capsys):
+        assert bench_main(['--depth', '2', '--position', 'endgame']) == 0
+        assert 'no late_move_reductions' in capsys.readouterr().out
+
+
+class TestStaticExchange:
+
+    @pytest.mark.parametrize('fen, move, score', [
+        ('1k1r4/1pp4p/p7/4p3/8/P5P1/1PP4P/2K1R3 w - - 0 1', 'e1e5', 100),
+        ('1k1r3q/1ppn3p/p4b2/4p3/8/P2N2P1/1PP1R1BP/2K1Q3 w - - 0 1', 'd3e5', -220),
+        ('4k3/8/2p5/3p4/4P3/8/8/4K3 w - - 0 1', 'e4d5', 0),
+        ('3rk3/8/8/3p4/8/8/3R4/3RK3 w - - 0 1', 'd2d5', 100),
+        ('3rk3/3r4/8/3p4/8/8/3R4/3RK3 w - - 0 1', 'd2d5', -400),
+    ])
+    def test_exchange(self, fen, move, score):
+        board = parse_fen(fen).board
+        assert static_exchange(board, Move(name_square(move[:2]), name_square(move[2:]))) == score
+
+
+class TestMoveOrdering:
+
+    def test_stages(self):
+        game_state = parse_fen('4k3/8/8/3q4/8/8/n2R4/1Q2K3 w - - 0 1')
+        moves = generate_legal_moves(game_state)
+        ordering = MoveOrdering(4)
+        killer = Move(57, 41)
+        hash_move = Move(57, 49)
+        for _ in range(2):
+            ordering.update_cutoff(game_state.current_step_player, killer, 1, 3)
+
+        ordered = [move_name(move) for move in ordering.order_moves(game_state, moves, 1, hash_move)]
+        assert len(ordered) == len(moves)
+        # Hash move, the queen capture, the knight captures by the cheaper attacker first, then the killer
+        assert ordered[:5] == ['b1b2', 'd2d5', 'd2a2', 'b1a2', 'b1b3']
+
+
+class TestComputerGame:
+
+    def test_computer_replies(self):
+        controller = ChessController()
+        session = controller.create_computer_game(FigureColor.WHITE)
+        # The computer opens the game playing white
+        assert session.last_result is not None
+        assert session.game_state.current_step_player == FigureColor.BLACK
@@ -0,0 +1,81 @@
+import pytest
+
+from chess.models.chess.fen import parse_fen
+from chess.models.chess.move import Move, encode_move, decode_move
+from chess.models.chess.movegen import generate_legal_moves
+from chess.models.chess.transposition_table import (
+    TranspositionTable, SharedTranspositionTable, BOUND_EXACT, BOUND_LOWER, BOUND_UPPER, HEADER_WORDS, get_buckets_count
+)
+from chess.perft import PERFT_POSITIONS_MAP
+
+
+class TestTranspositionTable:
+
+    def test_move_encoding(self):
+        for name in ('kiwipete', 'promotions', 'talkchess'):
+            for move in generate_legal_moves(parse_fen(PERFT_POSITIONS_MAP[name].fen)):
+                assert decode_move(encode_move(move)) == move
+
+    def test_size_limit(self):
+        table = TranspositionTable(1)
+        assert table.size_bytes <= 1024 * 1024
+        assert table.buckets_count == get_buckets_count(1)
+
+    def test_store_and_probe(self):
+        table = TranspositionTable(1)
+        key = 0x123456789ABCDEF0
+        assert table.probe(key) is None
+
+        table.store(key, 5, BOUND_EXACT, -120, Move(12, 28))
+        entry = table.probe(key)
+        assert (entry.depth, entry.bound, entry.score, entry.move) == (5, BOUND_EXACT, -120, Move(12, 28))
+        assert table.probe(key ^ 1 << 63) is None
+
+    def test_replacement(self):
+        table = TranspositionTable(1)
+        step = table.buckets_count
+        deep, shallow, latest = 7, 7 + step, 7 + 2 * step
+
+        table.store(deep, 8, BOUND_LOWER, 10)
+        table.store(shallow, 2, BOUND_UPPER, 20)
+        table.store(latest, 1, BOUND_UPPER, 30)
+        # The deep result stays, the always replace entry keeps the latest one
+        assert table.probe(deep).depth == 8
+        assert table.probe(shallow) is None
+        assert table.probe(latest).score == 30
+
+        # Results of an older search give way to the new ones
+        table.new_search()
+        table.store(shallow, 1, BOUND_EXACT, 40)
+        assert table.probe(shallow).score == 40
+        assert table.probe(deep).depth == 8
+
+    def test_torn_entry(self):
+        table = TranspositionTable(1)
+        key = 0x0FEDCBA987654321
+        table.store(key, 3, BOUND_EXACT, 55, Move(52, 36))
+        # Data of another write, the entry no longer verifies against its key
+        index = HEADER_WORDS + key % table.buckets_count * 4
+        table._words[index + 1] ^= 1 << 20
+        assert table.probe(key) is None
+
+    def test_from_buffer(self):
+        table = TranspositionTable(1)
+        table.store(42, 4, BOUND_LOWER, 7)
+        table.new_search()
+        view = TranspositionTable.from_buffer(table._buffer)
+        assert view.probe(42).score == 7
+        assert view.generation == table.generation
+        with pytest.raises(ValueError):
+            TranspositionTable.from_buffer(memoryview(bytearray(1024)))
+
+    def test_shared_table(self):
+        table = SharedTranspositionTable.create(1)
+        try:
+            attached = SharedTranspositionTable.attach(table.name)
+            attached.store(99, 6, BOUND_UPPER, -30, Move(6, 21))
+            assert table.probe(99).move == Move(6, 21)
+            attached.close()
+        finally:
+            table.close()
+            table.unlink()
@@ -0,0 +1,65 @@
+import random
+
+import numpy as np
+import pytest
+
+from chess.models.chess.fen import parse_fen, to_fen
+from chess.perft import PERFT_POSITIONS
+from chess.models.chess.piece_square_tables import FIGURE_VALUES, PLACEMENT_TABLES, load_tables
+from chess.tune import CorpusError, get_initial_weights, iter_batches, main, parse_result, split_values, tune
+from tests.helpers import random_walk
+
+
+def write_corpus(path, count: int):
+    """Random positions labelled by their material, with their scores"""
+    rnd = random.Random(6)
+    lines, scores = [], []
+    for _ in range(count):
+        game_state = parse_fen(rnd.choice(PERFT_POSITIONS).fen)
+        for _ in random_walk(game_state, rnd.randint(1, 20), rnd):
+            pass
+        result = '1-0' if game_state.score > 150 else '0-1' if game_state.score < -150 else '1/2-1/2'
+        lines.append(f'{to_fen(game_state)} "{result}";')
+        scores.append(game_state.score)
+    path.write_text('\n'.join(lines) + '\n')
+    return scores
+
+
+class TestTune:
+
+    def test_parse_result(self):
+        assert [parse_result(token) for token in ('"1-0";', '[0.5]', '0-1', '1/2-1/2')] == [1.0, 0.5, 0.0, 0.5]
+        with pytest.raises(CorpusError):
+            parse_result('2-0')
+
+    def test_features_match_score(self, tmp_path):
+        path = tmp_path / 'corpus.epd'
+        scores = write_corpus(path, 50)
+        batches = list(iter_batches([str(path)], 20))
+        assert [len(results) for _, results in batches] == [20, 20, 10]
+        features = np.concatenate([features for features, _ in batches])
+        assert (features @ get_initial_weights()).tolist() == scores
+
+    def test_error_decreases(self, tmp_path):
+        path = tmp_path / 'corpus.epd'
+        write_corpus(path, 100)
+        errors = []
+        values, _ = tune([str(path)], epochs=3, batch_size=32, on_epoch=lambda epoch, error: errors.append(error))
+        assert errors[0] > errors[-1]
+
+        figure_values, tables = split_values(values)
+        assert figure_values[-1] == 0
+        assert not tables[0, :8].any()
+
+    def test_output_loads(self, tmp_path, capsys):
+        path = tmp_path / 'corpus.epd'
+        write_corpus(path, 20)
+        output = tmp_path / 'tables.npz'
+        assert main([str(path), '--epochs', '1', '--output', str(output)]) == 0
+        figure_values, tables = load_tables(str(output))
+        assert len(figure_values) == len(FIGURE_VALUES) and figure_values[-1] == 0
+        assert [len(table) for table in tables] == [len(table) for table in PLACEMENT_TABLES]
+
+        np.savez(tmp_path / 'broken.npz', tables=np.array(tables))
+        with pytest.raises(ValueError):
+            load_tables(str(tmp_path / 'broken.npz'))
@@ -0,0 +1,49 @@
+from chess.lib.vec import vec
+from chess.models.chess.bitboard import name_square
+from chess.models.chess.chess_engine import ChessEngine
+from chess.models.chess.fen import START_FEN, parse_fen
+from chess.models.chess.games import ClassicGame, DebugGame
+from chess.models.chess.movegen import get_legal_move
+from tests.helpers import check_incremental
+
+
+class TestZobrist:
+
+    def test_incremental_key_matches_full_key(self):
+        check_incremental(lambda game_state: game_state.position_key(),
+                          lambda game_state: game_state.copy().position_key(), 40, seed=1)
+
+    def test_transposition(self):
+        first, second = ChessEngine(ClassicGame()), ChessEngine(ClassicGame())
+        for pos_from, pos_to in [((1, 7), (2, 5)), ((1, 0), (2, 2)), ((6, 7), (5, 5)), ((6, 0), (5, 2))]:
+            first.do_peace(vec(*pos_from), vec(*pos_to))
+        for pos_from, pos_to in [((6, 7), (5, 5)), ((6, 0), (5, 2)), ((1, 7), (2, 5)), ((1, 0), (2, 2))]:
+            second.do_peace(vec(*pos_from), vec(*pos_to))
+        assert first.game_state.position_key() == second.game_state.position_key()
+
+    def test_side_castling_and_en_passant(self):
+        keys = {
+            parse_fen(START_FEN).position_key(),
+            parse_fen(START_FEN.replace(' w ', ' b ')).position_key(),
+            parse_fen(START_FEN.replace('KQkq', 'Qkq')).position_key(),
+            parse_fen('rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq e3 0 1').position_key(),
+            parse_fen('rnbqkbnr/ppp1pppp/8/8/3pP3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1').position_key(),
+        }
+        assert len(keys) == 5
+
+    def test_unusable_en_passant(self):
+        # No black pawn can take on e3, the square doesn't change the position
+        fen = 'rnbqkbnr/pppppppp/8/8/4P3/8/PPPP1PPP/RNBQKBNR b KQkq - 0 1'
+        assert parse_fen(fen.replace(' - ', ' e3 ')).position_key() == parse_fen(fen).position_key()
+        game_state = parse_fen(START_FEN)
+        game_state.make_move(get_legal_move(game_state, name_square('e2'), name_square('e4')))
+        assert game_state.en_passant_square == name_square('e3')
+        assert game_state.position_key() == parse_fen(fen).position_key()
+
+    def test_debug_game_keeps_side(self):
+        engine = ChessEngine(DebugGame())
+        key = engine.game_state.position_key()
+        move = engine.generate_legal_moves()[0]
+        engine.play_move(move)
+        engine.unmake_move()
+        assert engine.game_state.position_key() == key